@@ -153,6 +153,11 @@ def _tables_for_sections(sections):
     return [table for table in CONFIG_TABLES if table in allowed]
 
 
+def _table_exists(cursor, table):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    return cursor.fetchone() is not None
+
+
 def _column_exists(cursor, table, column):
     cursor.execute(f'PRAGMA table_info({table})')
     return any(row[1] == column for row in cursor.fetchall())
@@ -298,29 +303,14 @@ def _student_is_active(row):
         return True
 
 
-def init_db():
-    """Create the SQLite tables and populate default rows.
-
-    This function also performs simple migrations when new columns are added in
-    later versions of the code. It is called on start-up and whenever the
-    database is reset via the web interface."""
-    # ``get_db`` will create the SQLite file if it does not already exist. To
-    # distinguish a brand new database from an existing one we check for the
-    # file beforehand.
-    db_exists = os.path.exists(DB_PATH)
-    conn = get_db()
-    c = conn.cursor()
-
-    def table_exists(name):
-        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,))
-        return c.fetchone() is not None
-
-    def column_exists(table, column):
-        c.execute(f"PRAGMA table_info({table})")
-        return column in [row[1] for row in c.fetchall()]
+def _ensure_schema(c):
+    """Create any missing tables and add columns introduced by later versions.
 
+    ``init_db`` calls this on every start; each check only touches what is
+    missing.
+    """
     # create tables if not present
-    if not table_exists('config'):
+    if not _table_exists(c, 'config'):
         c.execute('''CREATE TABLE config (
             id INTEGER PRIMARY KEY,
             slots_per_day INTEGER,
@@ -347,31 +337,31 @@ def init_db():
             solver_backend TEXT DEFAULT 'ortools'
         )''')
     else:
-        if not column_exists('config', 'slot_start_times'):
+        if not _column_exists(c, 'config', 'slot_start_times'):
             c.execute('ALTER TABLE config ADD COLUMN slot_start_times TEXT')
-        if not column_exists('config', 'require_all_subjects'):
+        if not _column_exists(c, 'config', 'require_all_subjects'):
             c.execute('ALTER TABLE config ADD COLUMN require_all_subjects INTEGER DEFAULT 1')
-        if not column_exists('config', 'use_attendance_priority'):
+        if not _column_exists(c, 'config', 'use_attendance_priority'):
             c.execute('ALTER TABLE config ADD COLUMN use_attendance_priority INTEGER DEFAULT 0')
-        if not column_exists('config', 'attendance_weight'):
+        if not _column_exists(c, 'config', 'attendance_weight'):
             c.execute('ALTER TABLE config ADD COLUMN attendance_weight INTEGER DEFAULT 10')
-        if not column_exists('config', 'group_weight'):
+        if not _column_exists(c, 'config', 'group_weight'):
             c.execute('ALTER TABLE config ADD COLUMN group_weight REAL DEFAULT 2.0')
-        if not column_exists('config', 'allow_multi_teacher'):
+        if not _column_exists(c, 'config', 'allow_multi_teacher'):
             c.execute('ALTER TABLE config ADD COLUMN allow_multi_teacher INTEGER DEFAULT 1')
-        if not column_exists('config', 'balance_teacher_load'):
+        if not _column_exists(c, 'config', 'balance_teacher_load'):
             c.execute('ALTER TABLE config ADD COLUMN balance_teacher_load INTEGER DEFAULT 0')
-        if not column_exists('config', 'balance_weight'):
+        if not _column_exists(c, 'config', 'balance_weight'):
             c.execute('ALTER TABLE config ADD COLUMN balance_weight INTEGER DEFAULT 1')
-        if not column_exists('config', 'well_attend_weight'):
+        if not _column_exists(c, 'config', 'well_attend_weight'):
             c.execute('ALTER TABLE config ADD COLUMN well_attend_weight REAL DEFAULT 1')
-        if not column_exists('config', 'solver_time_limit'):
+        if not _column_exists(c, 'config', 'solver_time_limit'):
             c.execute('ALTER TABLE config ADD COLUMN solver_time_limit INTEGER DEFAULT 120')
-        if not column_exists('config', 'solver_backend'):
+        if not _column_exists(c, 'config', 'solver_backend'):
             c.execute("ALTER TABLE config ADD COLUMN solver_backend TEXT DEFAULT 'ortools'")
             c.execute("UPDATE config SET solver_backend='ortools' WHERE solver_backend IS NULL OR TRIM(solver_backend)=''")
 
-    if not table_exists('teachers'):
+    if not _table_exists(c, 'teachers'):
         c.execute('''CREATE TABLE teachers (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE,
@@ -381,17 +371,17 @@ def init_db():
             needs_lessons INTEGER NOT NULL DEFAULT 1
         )''')
     else:
-        if not column_exists('teachers', 'needs_lessons'):
+        if not _column_exists(c, 'teachers', 'needs_lessons'):
             c.execute('ALTER TABLE teachers ADD COLUMN needs_lessons INTEGER NOT NULL DEFAULT 1')
         c.execute('UPDATE teachers SET needs_lessons = 1 WHERE needs_lessons IS NULL')
 
-    if not table_exists('teachers_archive'):
+    if not _table_exists(c, 'teachers_archive'):
         c.execute('''CREATE TABLE teachers_archive (
             id INTEGER PRIMARY KEY,
             name TEXT
         )''')
 
-    if not table_exists('students'):
+    if not _table_exists(c, 'students'):
         c.execute('''CREATE TABLE students (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE,
@@ -407,62 +397,62 @@ def init_db():
             repeat_subjects TEXT
         )''')
     else:
-        if not column_exists('students', 'active'):
+        if not _column_exists(c, 'students', 'active'):
             c.execute('ALTER TABLE students ADD COLUMN active INTEGER DEFAULT 1')
-        if not column_exists('students', 'min_lessons'):
+        if not _column_exists(c, 'students', 'min_lessons'):
             c.execute('ALTER TABLE students ADD COLUMN min_lessons INTEGER')
-        if not column_exists('students', 'max_lessons'):
+        if not _column_exists(c, 'students', 'max_lessons'):
             c.execute('ALTER TABLE students ADD COLUMN max_lessons INTEGER')
-        if not column_exists('students', 'allow_repeats'):
+        if not _column_exists(c, 'students', 'allow_repeats'):
             c.execute('ALTER TABLE students ADD COLUMN allow_repeats INTEGER')
-        if not column_exists('students', 'max_repeats'):
+        if not _column_exists(c, 'students', 'max_repeats'):
             c.execute('ALTER TABLE students ADD COLUMN max_repeats INTEGER')
-        if not column_exists('students', 'allow_consecutive'):
+        if not _column_exists(c, 'students', 'allow_consecutive'):
             c.execute('ALTER TABLE students ADD COLUMN allow_consecutive INTEGER')
-        if not column_exists('students', 'prefer_consecutive'):
+        if not _column_exists(c, 'students', 'prefer_consecutive'):
             c.execute('ALTER TABLE students ADD COLUMN prefer_consecutive INTEGER')
-        if not column_exists('students', 'allow_multi_teacher'):
+        if not _column_exists(c, 'students', 'allow_multi_teacher'):
             c.execute('ALTER TABLE students ADD COLUMN allow_multi_teacher INTEGER')
-        if not column_exists('students', 'repeat_subjects'):
+        if not _column_exists(c, 'students', 'repeat_subjects'):
             c.execute('ALTER TABLE students ADD COLUMN repeat_subjects TEXT')
 
-    if not table_exists('students_archive'):
+    if not _table_exists(c, 'students_archive'):
         c.execute('''CREATE TABLE students_archive (
             id INTEGER PRIMARY KEY,
             name TEXT
         )''')
 
-    if not table_exists('subjects'):
+    if not _table_exists(c, 'subjects'):
         c.execute('''CREATE TABLE subjects (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE,
             min_percentage INTEGER
         )''')
     else:
-        if not column_exists('subjects', 'min_percentage'):
+        if not _column_exists(c, 'subjects', 'min_percentage'):
             c.execute('ALTER TABLE subjects ADD COLUMN min_percentage INTEGER')
 
-    if not table_exists('subjects_archive'):
+    if not _table_exists(c, 'subjects_archive'):
         c.execute('''CREATE TABLE subjects_archive (
             id INTEGER PRIMARY KEY,
             name TEXT
         )''')
 
-    if not table_exists('teacher_unavailable'):
+    if not _table_exists(c, 'teacher_unavailable'):
         c.execute('''CREATE TABLE teacher_unavailable (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             teacher_id INTEGER,
             slot INTEGER
         )''')
 
-    if not table_exists('student_unavailable'):
+    if not _table_exists(c, 'student_unavailable'):
         c.execute('''CREATE TABLE student_unavailable (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             student_id INTEGER,
             slot INTEGER
         )''')
 
-    if not table_exists('fixed_assignments'):
+    if not _table_exists(c, 'fixed_assignments'):
         c.execute('''CREATE TABLE fixed_assignments (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             teacher_id INTEGER,
@@ -473,12 +463,12 @@ def init_db():
             slot INTEGER
         )''')
     else:
-        if not column_exists('fixed_assignments', 'group_id'):
+        if not _column_exists(c, 'fixed_assignments', 'group_id'):
             c.execute('ALTER TABLE fixed_assignments ADD COLUMN group_id INTEGER')
-        if not column_exists('fixed_assignments', 'subject_id'):
+        if not _column_exists(c, 'fixed_assignments', 'subject_id'):
             c.execute('ALTER TABLE fixed_assignments ADD COLUMN subject_id INTEGER')
 
-    if not table_exists('timetable'):
+    if not _table_exists(c, 'timetable'):
         c.execute('''CREATE TABLE timetable (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             student_id INTEGER,
@@ -491,40 +481,40 @@ def init_db():
             date TEXT
         )''')
     else:
-        if not column_exists('timetable', 'date'):
+        if not _column_exists(c, 'timetable', 'date'):
             c.execute('ALTER TABLE timetable ADD COLUMN date TEXT')
-        if not column_exists('timetable', 'group_id'):
+        if not _column_exists(c, 'timetable', 'group_id'):
             c.execute('ALTER TABLE timetable ADD COLUMN group_id INTEGER')
-        if not column_exists('timetable', 'location_id'):
+        if not _column_exists(c, 'timetable', 'location_id'):
             c.execute('ALTER TABLE timetable ADD COLUMN location_id INTEGER')
-        if not column_exists('timetable', 'subject_id'):
+        if not _column_exists(c, 'timetable', 'subject_id'):
             c.execute('ALTER TABLE timetable ADD COLUMN subject_id INTEGER')
 
-    if not table_exists('locations'):
+    if not _table_exists(c, 'locations'):
         c.execute('''CREATE TABLE locations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE
         )''')
 
-    if not table_exists('locations_archive'):
+    if not _table_exists(c, 'locations_archive'):
         c.execute('''CREATE TABLE locations_archive (
             id INTEGER PRIMARY KEY,
             name TEXT
         )''')
 
-    if not table_exists('student_locations'):
+    if not _table_exists(c, 'student_locations'):
         c.execute('''CREATE TABLE student_locations (
             student_id INTEGER,
             location_id INTEGER
         )''')
 
-    if not table_exists('group_locations'):
+    if not _table_exists(c, 'group_locations'):
         c.execute('''CREATE TABLE group_locations (
             group_id INTEGER,
             location_id INTEGER
         )''')
 
-    if not table_exists('timetable_snapshot'):
+    if not _table_exists(c, 'timetable_snapshot'):
         c.execute('''CREATE TABLE timetable_snapshot (
             date TEXT PRIMARY KEY,
             missing TEXT,
@@ -534,25 +524,14 @@ def init_db():
             teacher_data TEXT
         )''')
     else:
-        if not column_exists('timetable_snapshot', 'group_data'):
+        if not _column_exists(c, 'timetable_snapshot', 'group_data'):
             c.execute('ALTER TABLE timetable_snapshot ADD COLUMN group_data TEXT')
-        if not column_exists('timetable_snapshot', 'location_data'):
+        if not _column_exists(c, 'timetable_snapshot', 'location_data'):
             c.execute('ALTER TABLE timetable_snapshot ADD COLUMN location_data TEXT')
-        if not column_exists('timetable_snapshot', 'teacher_data'):
+        if not _column_exists(c, 'timetable_snapshot', 'teacher_data'):
             c.execute('ALTER TABLE timetable_snapshot ADD COLUMN teacher_data TEXT')
-        rows = c.execute(
-            "SELECT date FROM timetable_snapshot "
-            "WHERE group_data IS NULL OR TRIM(group_data) = '' "
-            "OR location_data IS NULL OR TRIM(location_data) = '' "
-            "OR teacher_data IS NULL OR TRIM(teacher_data) = ''"
-        ).fetchall()
-        for row in rows:
-            try:
-                get_missing_and_counts(c, row['date'], refresh=True)
-            except Exception:
-                logging.exception('Failed to refresh timetable snapshot for %s', row['date'])
 
-    if not table_exists('attendance_log'):
+    if not _table_exists(c, 'attendance_log'):
         c.execute('''CREATE TABLE attendance_log (
             student_id INTEGER,
             student_name TEXT,
@@ -561,10 +540,10 @@ def init_db():
             date TEXT
         )''')
     else:
-        if not column_exists('attendance_log', 'subject_id'):
+        if not _column_exists(c, 'attendance_log', 'subject_id'):
             c.execute('ALTER TABLE attendance_log ADD COLUMN subject_id INTEGER')
 
-    if not table_exists('worksheets'):
+    if not _table_exists(c, 'worksheets'):
         c.execute('''CREATE TABLE worksheets (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             student_id INTEGER,
@@ -572,37 +551,37 @@ def init_db():
             date TEXT
         )''')
     else:
-        if not column_exists('worksheets', 'subject_id'):
+        if not _column_exists(c, 'worksheets', 'subject_id'):
             c.execute('ALTER TABLE worksheets ADD COLUMN subject_id INTEGER')
 
-    if not table_exists('groups'):
+    if not _table_exists(c, 'groups'):
         c.execute('''CREATE TABLE groups (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE,
             subjects TEXT
         )''')
 
-    if not table_exists('group_members'):
+    if not _table_exists(c, 'group_members'):
         c.execute('''CREATE TABLE group_members (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             group_id INTEGER,
             student_id INTEGER
         )''')
 
-    if not table_exists('groups_archive'):
+    if not _table_exists(c, 'groups_archive'):
         c.execute('''CREATE TABLE groups_archive (
             id INTEGER PRIMARY KEY,
             name TEXT
         )''')
 
-    if not table_exists('student_teacher_block'):
+    if not _table_exists(c, 'student_teacher_block'):
         c.execute('''CREATE TABLE student_teacher_block (
             student_id INTEGER,
             teacher_id INTEGER,
             PRIMARY KEY(student_id, teacher_id)
         )''')
 
-    if not table_exists('config_presets'):
+    if not _table_exists(c, 'config_presets'):
         c.execute('''CREATE TABLE config_presets (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT,
@@ -612,255 +591,288 @@ def init_db():
         )''')
 
 
-    # prune corrupt or excess presets
-    def cleanup_presets(cur):
-        cur.execute('SELECT id, data FROM config_presets ORDER BY created_at DESC')
-        rows = cur.fetchall()
-        for r in rows[MAX_PRESETS:]:
-            cur.execute('DELETE FROM config_presets WHERE id=?', (r['id'],))
-        for r in rows[:MAX_PRESETS]:
+def init_db():
+    """Create the SQLite tables and populate default rows.
+
+    This function also performs simple migrations when new columns are added in
+    later versions of the code. It is called on start-up and whenever the
+    database is reset via the web interface."""
+    # ``get_db`` will create the SQLite file if it does not already exist. To
+    # distinguish a brand new database from an existing one we check for the
+    # file beforehand.
+    db_exists = os.path.exists(DB_PATH)
+    conn = get_db()
+    c = conn.cursor()
+    # sqlite3 runs DDL in autocommit mode, so without an explicit transaction
+    # every CREATE TABLE and ALTER TABLE below would be committed separately.
+    conn.execute('BEGIN')
+    try:
+        _ensure_schema(c)
+
+        # rebuild snapshots saved before group, location or teacher data existed
+        rows = c.execute(
+            "SELECT date FROM timetable_snapshot "
+            "WHERE group_data IS NULL OR TRIM(group_data) = '' "
+            "OR location_data IS NULL OR TRIM(location_data) = '' "
+            "OR teacher_data IS NULL OR TRIM(teacher_data) = ''"
+        ).fetchall()
+        for row in rows:
             try:
-                json.loads(r['data'])
+                get_missing_and_counts(c, row['date'], refresh=True)
             except Exception:
-                logging.warning('Removing corrupted preset %s', r['id'])
+                logging.exception('Failed to refresh timetable snapshot for %s', row['date'])
+
+        # prune corrupt or excess presets
+        def cleanup_presets(cur):
+            cur.execute('SELECT id, data FROM config_presets ORDER BY created_at DESC')
+            rows = cur.fetchall()
+            for r in rows[MAX_PRESETS:]:
                 cur.execute('DELETE FROM config_presets WHERE id=?', (r['id'],))
+            for r in rows[:MAX_PRESETS]:
+                try:
+                    json.loads(r['data'])
+                except Exception:
+                    logging.warning('Removing corrupted preset %s', r['id'])
+                    cur.execute('DELETE FROM config_presets WHERE id=?', (r['id'],))
 
-    cleanup_presets(c)
+        cleanup_presets(c)
 
-    # --- migrate subjects from names to ids and populate subject_id columns ---
-    # Earlier versions stored subject names directly which caused issues when
-    # migrating to integer IDs.  Some runs also introduced duplicate subject
-    # rows where the ``name`` column held an old numeric ID.  Clean those up
-    # first so subsequent mapping uses a stable subject table.
-    c.execute('SELECT id, name FROM subjects')
-    rows = c.fetchall()
-    existing_ids = {r['id'] for r in rows}
-    numeric_dupes = []
-    for r in rows:
-        nm = r['name']
-        if nm and str(nm).isdigit():
-            num = int(nm)
-            if num in existing_ids and num != r['id']:
-                numeric_dupes.append((r['id'], num))
-
-    # Re-point any references that used the duplicate IDs to the correct one
-    for bad_id, good_id in numeric_dupes:
-        for tbl in ('timetable', 'worksheets', 'fixed_assignments', 'attendance_log'):
-            if table_exists(tbl) and column_exists(tbl, 'subject_id'):
-                c.execute(f'UPDATE {tbl} SET subject_id=? WHERE subject_id=?', (good_id, bad_id))
-        for tbl in ('teachers', 'students', 'groups'):
-            if table_exists(tbl):
-                c.execute(f'SELECT id, subjects FROM {tbl}')
-                for row in c.fetchall():
+        # --- migrate subjects from names to ids and populate subject_id columns ---
+        # Earlier versions stored subject names directly which caused issues when
+        # migrating to integer IDs.  Some runs also introduced duplicate subject
+        # rows where the ``name`` column held an old numeric ID.  Clean those up
+        # first so subsequent mapping uses a stable subject table.
+        c.execute('SELECT id, name FROM subjects')
+        rows = c.fetchall()
+        existing_ids = {r['id'] for r in rows}
+        numeric_dupes = []
+        for r in rows:
+            nm = r['name']
+            if nm and str(nm).isdigit():
+                num = int(nm)
+                if num in existing_ids and num != r['id']:
+                    numeric_dupes.append((r['id'], num))
+
+        # Re-point any references that used the duplicate IDs to the correct one
+        for bad_id, good_id in numeric_dupes:
+            for tbl in ('timetable', 'worksheets', 'fixed_assignments', 'attendance_log'):
+                if _table_exists(c, tbl) and _column_exists(c, tbl, 'subject_id'):
+                    c.execute(f'UPDATE {tbl} SET subject_id=? WHERE subject_id=?', (good_id, bad_id))
+            for tbl in ('teachers', 'students', 'groups'):
+                if _table_exists(c, tbl):
+                    c.execute(f'SELECT id, subjects FROM {tbl}')
+                    for row in c.fetchall():
+                        try:
+                            subj_ids = json.loads(row['subjects']) if row['subjects'] else []
+                        except Exception:
+                            subj_ids = []
+                        if bad_id in subj_ids:
+                            subj_ids = [good_id if i == bad_id else i for i in subj_ids]
+                            c.execute(
+                                f'UPDATE {tbl} SET subjects=? WHERE id=?',
+                                (json.dumps(subj_ids), row['id'])
+                            )
+            c.execute('DELETE FROM subjects WHERE id=?', (bad_id,))
+
+        # Refresh subject map after cleanup
+        c.execute('SELECT id, name FROM subjects')
+        subj_map = {r['name']: r['id'] for r in c.fetchall()}
+
+        def ensure_subject(value):
+            if value is None:
+                return None
+            # Treat integers or digit strings as existing IDs when possible
+            if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+                sid = int(value)
+                c.execute('SELECT 1 FROM subjects WHERE id=?', (sid,))
+                if c.fetchone():
+                    return sid
+                return None
+            name = value
+            sid = subj_map.get(name)
+            if sid is None:
+                c.execute('INSERT INTO subjects (name) VALUES (?)', (name,))
+                sid = c.lastrowid
+                subj_map[name] = sid
+            return sid
+
+        # convert subject lists for teachers, students and groups
+        for table in ('teachers', 'students', 'groups'):
+            if _table_exists(c, table):
+                c.execute(f'SELECT id, subjects FROM {table}')
+                rows = c.fetchall()
+                for row in rows:
                     try:
-                        subj_ids = json.loads(row['subjects']) if row['subjects'] else []
+                        items = json.loads(row['subjects']) if row['subjects'] else []
                     except Exception:
-                        subj_ids = []
-                    if bad_id in subj_ids:
-                        subj_ids = [good_id if i == bad_id else i for i in subj_ids]
-                        c.execute(
-                            f'UPDATE {tbl} SET subjects=? WHERE id=?',
-                            (json.dumps(subj_ids), row['id'])
-                        )
-        c.execute('DELETE FROM subjects WHERE id=?', (bad_id,))
+                        items = []
+                    ids = []
+                    for it in items:
+                        sid = ensure_subject(it)
+                        if sid is not None:
+                            ids.append(sid)
+                    c.execute(
+                        f'UPDATE {table} SET subjects=? WHERE id=?',
+                        (json.dumps(ids), row['id'])
+                    )
 
-    # Refresh subject map after cleanup
-    c.execute('SELECT id, name FROM subjects')
-    subj_map = {r['name']: r['id'] for r in c.fetchall()}
-
-    def ensure_subject(value):
-        if value is None:
-            return None
-        # Treat integers or digit strings as existing IDs when possible
-        if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
-            sid = int(value)
-            c.execute('SELECT 1 FROM subjects WHERE id=?', (sid,))
-            if c.fetchone():
-                return sid
-            return None
-        name = value
-        sid = subj_map.get(name)
-        if sid is None:
-            c.execute('INSERT INTO subjects (name) VALUES (?)', (name,))
-            sid = c.lastrowid
-            subj_map[name] = sid
-        return sid
-
-    # convert subject lists for teachers, students and groups
-    for table in ('teachers', 'students', 'groups'):
-        if table_exists(table):
-            c.execute(f'SELECT id, subjects FROM {table}')
-            rows = c.fetchall()
-            for row in rows:
-                try:
-                    items = json.loads(row['subjects']) if row['subjects'] else []
-                except Exception:
-                    items = []
-                ids = []
-                for it in items:
-                    sid = ensure_subject(it)
-                    if sid is not None:
-                        ids.append(sid)
+        # populate subject_id columns for existing rows
+        for tbl in ('timetable', 'worksheets', 'fixed_assignments', 'attendance_log'):
+            if _table_exists(c, tbl) and _column_exists(c, tbl, 'subject_id') and _column_exists(c, tbl, 'subject'):
+                # Selecting ``rowid`` directly can return the primary key column name
+                # (e.g. ``id``) depending on the table definition.  Alias it to a
+                # stable column name so it can be accessed reliably from the row
+                # mapping.
                 c.execute(
-                    f'UPDATE {table} SET subjects=? WHERE id=?',
-                    (json.dumps(ids), row['id'])
+                    f'SELECT rowid AS rid, subject FROM {tbl} '
+                    'WHERE subject IS NOT NULL AND (subject_id IS NULL OR subject_id="")'
                 )
+                for r in c.fetchall():
+                    sid = ensure_subject(r['subject'])
+                    if sid is not None:
+                        c.execute(
+                            f'UPDATE {tbl} SET subject_id=? WHERE rowid=?',
+                            (sid, r['rid'])
+                        )
 
-    # populate subject_id columns for existing rows
-    for tbl in ('timetable', 'worksheets', 'fixed_assignments', 'attendance_log'):
-        if table_exists(tbl) and column_exists(tbl, 'subject_id') and column_exists(tbl, 'subject'):
-            # Selecting ``rowid`` directly can return the primary key column name
-            # (e.g. ``id``) depending on the table definition.  Alias it to a
-            # stable column name so it can be accessed reliably from the row
-            # mapping.
+        # Remove legacy subject column from worksheets now that IDs are populated
+        if _table_exists(c, 'worksheets'):
+            # purge any remaining duplicates after migration
             c.execute(
-                f'SELECT rowid AS rid, subject FROM {tbl} '
-                'WHERE subject IS NOT NULL AND (subject_id IS NULL OR subject_id="")'
+                '''DELETE FROM worksheets WHERE rowid NOT IN (
+                       SELECT MIN(rowid) FROM worksheets
+                       GROUP BY student_id, subject_id, date
+                   )'''
             )
-            for r in c.fetchall():
-                sid = ensure_subject(r['subject'])
-                if sid is not None:
-                    c.execute(
-                        f'UPDATE {tbl} SET subject_id=? WHERE rowid=?',
-                        (sid, r['rid'])
-                    )
-
-    # Remove legacy subject column from worksheets now that IDs are populated
-    if table_exists('worksheets'):
-        # purge any remaining duplicates after migration
-        c.execute(
-            '''DELETE FROM worksheets WHERE rowid NOT IN (
-                   SELECT MIN(rowid) FROM worksheets
-                   GROUP BY student_id, subject_id, date
-               )'''
-        )
-        removed = c.rowcount
-        if column_exists('worksheets', 'subject'):
-            c.execute('ALTER TABLE worksheets RENAME TO worksheets_old')
-            c.execute('''CREATE TABLE worksheets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id INTEGER,
-                subject_id INTEGER,
-                date TEXT
-            )''')
+            removed = c.rowcount
+            if _column_exists(c, 'worksheets', 'subject'):
+                c.execute('ALTER TABLE worksheets RENAME TO worksheets_old')
+                c.execute('''CREATE TABLE worksheets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    student_id INTEGER,
+                    subject_id INTEGER,
+                    date TEXT
+                )''')
+                c.execute(
+                    'INSERT INTO worksheets (id, student_id, subject_id, date) '
+                    'SELECT id, student_id, subject_id, date FROM worksheets_old'
+                )
+                c.execute('DROP TABLE worksheets_old')
             c.execute(
-                'INSERT INTO worksheets (id, student_id, subject_id, date) '
-                'SELECT id, student_id, subject_id, date FROM worksheets_old'
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_worksheets_unique '
+                'ON worksheets(student_id, subject_id, date)'
             )
-            c.execute('DROP TABLE worksheets_old')
-        c.execute(
-            'CREATE UNIQUE INDEX IF NOT EXISTS idx_worksheets_unique '
-            'ON worksheets(student_id, subject_id, date)'
-        )
-        if removed and table_exists('timetable_snapshot'):
-            c.execute('DELETE FROM timetable_snapshot')
+            if removed and _table_exists(c, 'timetable_snapshot'):
+                c.execute('DELETE FROM timetable_snapshot')
 
-    # Rebuild remaining tables without obsolete subject name columns
-    for tbl, create_sql, cols, index_sql in [
-        (
-            'timetable',
-            '''CREATE TABLE timetable (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id INTEGER,
-                group_id INTEGER,
-                teacher_id INTEGER,
-                subject_id INTEGER,
-                slot INTEGER,
-                location_id INTEGER,
-                date TEXT
-            )''',
-            'id, student_id, group_id, teacher_id, subject_id, slot, location_id, date',
-            None,
-        ),
-        (
-            'fixed_assignments',
-            '''CREATE TABLE fixed_assignments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                teacher_id INTEGER,
-                student_id INTEGER,
-                group_id INTEGER,
-                subject_id INTEGER,
-                slot INTEGER
-            )''',
-            'id, teacher_id, student_id, group_id, subject_id, slot',
-            'CREATE UNIQUE INDEX IF NOT EXISTS idx_fixed_assignments_unique '
-            'ON fixed_assignments(teacher_id, student_id, group_id, subject_id, slot)',
-        ),
-        (
-            'attendance_log',
-            '''CREATE TABLE attendance_log (
-                student_id INTEGER,
-                student_name TEXT,
-                subject_id INTEGER,
-                date TEXT
-            )''',
-            'student_id, student_name, subject_id, date',
-            None,
-        ),
-    ]:
-        if table_exists(tbl) and column_exists(tbl, 'subject'):
-            c.execute(f'ALTER TABLE {tbl} RENAME TO {tbl}_old')
-            c.execute(create_sql)
-            c.execute(
-                f'INSERT INTO {tbl} ({cols}) SELECT {cols} FROM {tbl}_old'
+        # Rebuild remaining tables without obsolete subject name columns
+        for tbl, create_sql, cols, index_sql in [
+            (
+                'timetable',
+                '''CREATE TABLE timetable (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    student_id INTEGER,
+                    group_id INTEGER,
+                    teacher_id INTEGER,
+                    subject_id INTEGER,
+                    slot INTEGER,
+                    location_id INTEGER,
+                    date TEXT
+                )''',
+                'id, student_id, group_id, teacher_id, subject_id, slot, location_id, date',
+                None,
+            ),
+            (
+                'fixed_assignments',
+                '''CREATE TABLE fixed_assignments (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    teacher_id INTEGER,
+                    student_id INTEGER,
+                    group_id INTEGER,
+                    subject_id INTEGER,
+                    slot INTEGER
+                )''',
+                'id, teacher_id, student_id, group_id, subject_id, slot',
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_fixed_assignments_unique '
+                'ON fixed_assignments(teacher_id, student_id, group_id, subject_id, slot)',
+            ),
+            (
+                'attendance_log',
+                '''CREATE TABLE attendance_log (
+                    student_id INTEGER,
+                    student_name TEXT,
+                    subject_id INTEGER,
+                    date TEXT
+                )''',
+                'student_id, student_name, subject_id, date',
+                None,
+            ),
+        ]:
+            if _table_exists(c, tbl) and _column_exists(c, tbl, 'subject'):
+                c.execute(f'ALTER TABLE {tbl} RENAME TO {tbl}_old')
+                c.execute(create_sql)
+                c.execute(
+                    f'INSERT INTO {tbl} ({cols}) SELECT {cols} FROM {tbl}_old'
+                )
+                c.execute(f'DROP TABLE {tbl}_old')
+                if index_sql:
+                    c.execute(index_sql)
+
+        # Only insert sample data when creating a brand new database file.  If the
+        # file already exists, assume any empty tables were intentionally cleared by
+        # the user and leave them empty.
+        if not db_exists:
+            start = 8 * 60 + 30
+            times = []
+            for i in range(8):
+                mins = start + i * 30
+                times.append(f"{mins // 60:02d}:{mins % 60:02d}")
+            c.execute('''INSERT INTO config (
+                id, slots_per_day, slot_duration, slot_start_times,
+                min_lessons, max_lessons, teacher_min_lessons, teacher_max_lessons,
+                allow_repeats, max_repeats,
+                prefer_consecutive, allow_consecutive, consecutive_weight,
+                require_all_subjects, use_attendance_priority, attendance_weight, group_weight,
+                allow_multi_teacher, balance_teacher_load, balance_weight,
+                well_attend_weight, solver_time_limit, solver_backend
+            ) VALUES (1, 8, 30, ?, 1, 4, 1, 8, 0, 2, 0, 1, 3, 1, 0, 10, 2.0, 1, 0, 1, 1, 120, 'ortools')''',
+                      (json.dumps(times),))
+            subjects = [
+                ('Math', 0),
+                ('English', 0),
+                ('Science', 0),
+                ('History', 0)
+            ]
+            c.executemany('INSERT INTO subjects (name, min_percentage) VALUES (?, ?)', subjects)
+            c.execute('SELECT id, name FROM subjects')
+            subj_map = {r['name']: r['id'] for r in c.fetchall()}
+            teachers = [
+                ('Teacher A', json.dumps([subj_map['Math'], subj_map['English']]), None, None, 1),
+                ('Teacher B', json.dumps([subj_map['Science']]), None, None, 1),
+                ('Teacher C', json.dumps([subj_map['History']]), None, None, 1),
+            ]
+            c.executemany(
+                'INSERT INTO teachers (name, subjects, min_lessons, max_lessons, needs_lessons) VALUES (?, ?, ?, ?, ?)',
+                teachers,
             )
-            c.execute(f'DROP TABLE {tbl}_old')
-            if index_sql:
-                c.execute(index_sql)
-
-    conn.commit()
-
-    # Only insert sample data when creating a brand new database file.  If the
-    # file already exists, assume any empty tables were intentionally cleared by
-    # the user and leave them empty.
-    if not db_exists:
-        start = 8 * 60 + 30
-        times = []
-        for i in range(8):
-            mins = start + i * 30
-            times.append(f"{mins // 60:02d}:{mins % 60:02d}")
-        c.execute('''INSERT INTO config (
-            id, slots_per_day, slot_duration, slot_start_times,
-            min_lessons, max_lessons, teacher_min_lessons, teacher_max_lessons,
-            allow_repeats, max_repeats,
-            prefer_consecutive, allow_consecutive, consecutive_weight,
-            require_all_subjects, use_attendance_priority, attendance_weight, group_weight,
-            allow_multi_teacher, balance_teacher_load, balance_weight,
-            well_attend_weight, solver_time_limit, solver_backend
-        ) VALUES (1, 8, 30, ?, 1, 4, 1, 8, 0, 2, 0, 1, 3, 1, 0, 10, 2.0, 1, 0, 1, 1, 120, 'ortools')''',
-                  (json.dumps(times),))
-        subjects = [
-            ('Math', 0),
-            ('English', 0),
-            ('Science', 0),
-            ('History', 0)
-        ]
-        c.executemany('INSERT INTO subjects (name, min_percentage) VALUES (?, ?)', subjects)
-        c.execute('SELECT id, name FROM subjects')
-        subj_map = {r['name']: r['id'] for r in c.fetchall()}
-        teachers = [
-            ('Teacher A', json.dumps([subj_map['Math'], subj_map['English']]), None, None, 1),
-            ('Teacher B', json.dumps([subj_map['Science']]), None, None, 1),
-            ('Teacher C', json.dumps([subj_map['History']]), None, None, 1),
-        ]
-        c.executemany(
-            'INSERT INTO teachers (name, subjects, min_lessons, max_lessons, needs_lessons) VALUES (?, ?, ?, ?, ?)',
-            teachers,
-        )
-        students = [
-            ('Student 1', json.dumps([subj_map['Math'], subj_map['English']])),
-            ('Student 2', json.dumps([subj_map['Math'], subj_map['Science']])),
-            ('Student 3', json.dumps([subj_map['English'], subj_map['History']])),
-            ('Student 4', json.dumps([subj_map['Science'], subj_map['Math']])),
-            ('Student 5', json.dumps([subj_map['History']])),
-            ('Student 6', json.dumps([subj_map['English'], subj_map['Science']])),
-            ('Student 7', json.dumps([subj_map['Math']])),
-            ('Student 8', json.dumps([subj_map['History'], subj_map['Science']])),
-            ('Student 9', json.dumps([subj_map['English']]))
-        ]
-        c.executemany('INSERT INTO students (name, subjects) VALUES (?, ?)', students)
-    conn.commit()
-    conn.close()
+            students = [
+                ('Student 1', json.dumps([subj_map['Math'], subj_map['English']])),
+                ('Student 2', json.dumps([subj_map['Math'], subj_map['Science']])),
+                ('Student 3', json.dumps([subj_map['English'], subj_map['History']])),
+                ('Student 4', json.dumps([subj_map['Science'], subj_map['Math']])),
+                ('Student 5', json.dumps([subj_map['History']])),
+                ('Student 6', json.dumps([subj_map['English'], subj_map['Science']])),
+                ('Student 7', json.dumps([subj_map['Math']])),
+                ('Student 8', json.dumps([subj_map['History'], subj_map['Science']])),
+                ('Student 9', json.dumps([subj_map['English']]))
+            ]
+            c.executemany('INSERT INTO students (name, subjects) VALUES (?, ?)', students)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
 
 def dump_configuration():
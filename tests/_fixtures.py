@@ -0,0 +1,24 @@
+"""Form data shared by tests that post to ``/config``."""
+
+# Default start times for the eight seeded half-hour slots.
+SLOT_STARTS = {f'slot_start_{i}': f'08:{30 + (i-1)*30:02d}' for i in range(1, 9)}
+
+# A valid baseline ``/config`` form, not a copy of the seeded configuration
+# (it turns repeats on, for one). Tests copy this with
+# ``{**BASE_CONFIG_FORM, ...}`` and add the fields they exercise.
+BASE_CONFIG_FORM = {
+    'slots_per_day': '8',
+    'slot_duration': '30',
+    'min_lessons': '1',
+    'max_lessons': '4',
+    'teacher_min_lessons': '1',
+    'teacher_max_lessons': '8',
+    'allow_repeats': '1',
+    'max_repeats': '2',
+    'consecutive_weight': '3',
+    'attendance_weight': '10',
+    'well_attend_weight': '1',
+    'group_weight': '2',
+    'balance_weight': '1',
+    **SLOT_STARTS,
+}
@@ -0,0 +1,146 @@
+"""Shared pytest fixtures for the timetable tests."""
+
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Imported at collection time so the Flask app and its solver modules load
+# once per process instead of inside whichever test happens to run first.
+import app
+
+
+# Per-connection settings for throwaway test databases. The data never has
+# to survive a crash, so the rollback journal stays in memory and commits do
+# not wait for fsync.
+_TEST_PRAGMAS = (
+    'PRAGMA journal_mode=MEMORY',
+    'PRAGMA synchronous=OFF',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+)
+
+
+# How long a worker waits for another worker to build the shared template.
+_TEMPLATE_WAIT_SECONDS = 120
+
+
+def _apply_test_pragmas(conn):
+    """Apply :data:`_TEST_PRAGMAS` to ``conn``."""
+    for pragma in _TEST_PRAGMAS:
+        conn.execute(pragma)
+
+
+@pytest.fixture(scope='session')
+def db_template(tmp_path_factory):
+    """Return the path of a database seeded once by ``app.init_db``.
+
+    ``init_db`` creates every table and the demo data, which is the slowest
+    part of most tests. Running it a single time per session and copying the
+    result keeps each test on a fresh database without paying that cost again.
+
+    Under ``pytest -n`` the template is shared by all workers through the
+    parent of their base temp directories. The first worker to create
+    ``template.db.lock`` exclusively builds the template privately and moves
+    it into place; the others wait for it to appear. The shared file is only
+    ever created once, so no worker replaces a file another one has open,
+    which Windows refuses.
+    """
+    root = tmp_path_factory.getbasetemp()
+    if os.environ.get('PYTEST_XDIST_WORKER'):
+        root = root.parent
+    shared = root / 'template.db'
+    try:
+        os.close(os.open(root / 'template.db.lock', os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        deadline = time.monotonic() + _TEMPLATE_WAIT_SECONDS
+        while not shared.exists():
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'Timed out waiting for {shared} to be built')
+            time.sleep(0.05)
+        return shared
+    path = tmp_path_factory.mktemp('template') / 'template.db'
+    original = app.DB_PATH
+    app.DB_PATH = str(path)
+    try:
+        app.init_db()
+    finally:
+        app.DB_PATH = original
+    os.replace(path, shared)
+    return shared
+
+
+@pytest.fixture(scope='session')
+def db_image(db_template):
+    """Return the raw bytes of the seeded template database."""
+    return db_template.read_bytes()
+
+
+@pytest.fixture
+def db_path(db_image, tmp_path, monkeypatch):
+    """Write the seeded template into ``tmp_path`` and point the app at it.
+
+    The copy lives on disk because ``app.get_db`` opens a new connection to
+    ``DB_PATH`` for every request, so an in-memory database would not be
+    shared with the code under test. Those connections get
+    :data:`_TEST_PRAGMAS` as well.
+    """
+    path = tmp_path / 'test.db'
+    path.write_bytes(db_image)
+    monkeypatch.setattr(app, 'DB_PATH', str(path))
+    get_db = app.get_db
+
+    def get_test_db():
+        conn = get_db()
+        _apply_test_pragmas(conn)
+        return conn
+
+    monkeypatch.setattr(app, 'get_db', get_test_db)
+    return path
+
+
+@pytest.fixture
+def client(db_path):
+    """Return a Flask test client bound to the per-test database copy."""
+    with app.app.test_client() as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db_conn(db_path):
+    """Yield one connection to the per-test database for the whole test.
+
+    Commit any writes before calling into the app, which uses its own
+    connections and would otherwise wait on the open transaction.
+    """
+    conn = sqlite3.connect(db_path, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    _apply_test_pragmas(conn)
+    yield conn
+    conn.close()
+
+
+def _ids_by_name(path, table):
+    """Return ``{name: id}`` for every row of ``table`` in the database at ``path``."""
+    conn = sqlite3.connect(path)
+    try:
+        return {name: row_id for row_id, name in conn.execute(f'SELECT id, name FROM {table}')}
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope='session')
+def subject_ids(db_template):
+    """Return a mapping of seeded subject names to their ids."""
+    return _ids_by_name(db_template, 'subjects')
+
+
+@pytest.fixture(scope='session')
+def student_ids(db_template):
+    """Return a mapping of seeded student names to their ids."""
+    return _ids_by_name(db_template, 'students')
@@ -2,19 +2,15 @@
 
 import json
 import importlib.util
-import os
-import sys
-import sqlite3
+from collections import defaultdict
+from functools import lru_cache
 from html.parser import HTMLParser
 
-from flask import get_flashed_messages
+from flask import session
+import pytest
 from werkzeug.datastructures import MultiDict
 
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-
-
-import pytest
+import app
 
 from solver.api import SolverResult, SolverStatus, build_model
 
@@ -22,25 +18,71 @@ from solver.api import SolverResult, SolverStatus, build_model
 ORTOOLS_AVAILABLE = importlib.util.find_spec("ortools") is not None
 
 
-def setup_db(tmp_path):
-    import app
+# Queries shared by the helpers and tests below. Keeping the SQL text
+# identical lets sqlite3's per-connection statement cache reuse them.
+_CONFIG_ROW_SQL = 'SELECT * FROM config WHERE id=1'
+_INSERT_GROUP_SQL = 'INSERT INTO groups (name, subjects) VALUES (?, ?)'
+_INSERT_GROUP_MEMBER_SQL = 'INSERT INTO group_members (group_id, student_id) VALUES (?, ?)'
+_INSERT_TEACHER_SQL = (
+    'INSERT INTO teachers (name, subjects, min_lessons, max_lessons, needs_lessons) '
+    'VALUES (?, ?, ?, ?, ?)'
+)
+_INSERT_STUDENT_TEACHER_BLOCK_SQL = (
+    'INSERT INTO student_teacher_block (student_id, teacher_id) VALUES (?, ?)'
+)
+# Names the tables that still hold rows for a deleted group.
+_GROUP_LEFTOVERS_SQL = (
+    "SELECT 'groups' FROM groups WHERE id=? "
+    "UNION ALL SELECT 'group_members' FROM group_members WHERE group_id=? "
+    "UNION ALL SELECT 'group_locations' FROM group_locations WHERE group_id=?"
+)
+
+# Warnings flashed when a student or group subject has no usable teacher.
+_NO_TEACHER_TMPL = 'No teacher available for {subj} for student {name}; the solver will skip this subject.'
+_NO_TEACHER_GROUP_TMPL = 'No teacher available for {subj} in group {name}; the solver will skip this subject.'
+_NO_SCHEDULED_TEACHER_TMPL = (
+    'No teacher scheduled for {subj} for student {name}; the solver will skip this subject.'
+)
+_NO_SCHEDULED_TEACHER_GROUP_TMPL = (
+    'No teacher scheduled for {subj} in group {name}; the solver will skip this subject.'
+)
+
+def _config_row(conn):
+    """Return the config row as a dict."""
+    return dict(conn.execute(_CONFIG_ROW_SQL).fetchone())
+
+
+def _seeded_subject(subject_ids, name):
+    """Return a row-like dict for the seeded subject called ``name``."""
+    return {'id': subject_ids[name], 'name': name}
+
+
+def _config_values(conn):
+    """Return the config row as a plain tuple for cheap equality checks.
+
+    Compare it with ``tuple(original.values())``; ``_config_row`` keeps the
+    column order, so both sides line up without building another dict.
+    """
+    return tuple(conn.execute(_CONFIG_ROW_SQL).fetchone())
 
-    app.DB_PATH = str(tmp_path / 'test.db')
-    app.init_db()
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
 
+def _valid_config_form(row):
+    return MultiDict(_config_pairs(row))
 
-def _config_row(db_path):
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    row = conn.execute('SELECT * FROM config WHERE id=1').fetchone()
-    conn.close()
-    return dict(row)
 
+def _config_pairs(row):
+    """Return a new list of the cached valid form pairs for ``row``."""
+    return list(_valid_config_pairs(tuple(sorted(row.items()))))
 
-def _valid_config_form(row):
+
+@lru_cache(maxsize=8)
+def _valid_config_pairs(row_items):
+    """Return the form pairs for a config row given as sorted ``items()``.
+
+    Most tests post the same seeded configuration, so the pairs are cached
+    and each caller receives a fresh ``MultiDict`` built from them.
+    """
+    row = dict(row_items)
     slot_starts = json.loads(row['slot_start_times']) if row['slot_start_times'] else []
     data = [
         ('slots_per_day', str(row['slots_per_day'])),
@@ -80,288 +122,246 @@ def _valid_config_form(row):
         if flag in repeat_flags and not row['allow_repeats']:
             continue
         data.append((flag, '1'))
-    return MultiDict(data)
+    return tuple(data)
+
+
+def _teacher_pairs(teacher, include_limits=False):
+    """Return the form pairs describing one teacher row."""
+    tid = teacher['id']
+    keys = teacher.keys()
+    pairs = [('teacher_id', str(tid)), (f'teacher_name_{tid}', teacher['name'])]
+    pairs.extend(
+        (f'teacher_subjects_{tid}', str(subj_id)) for subj_id in json.loads(teacher['subjects'])
+    )
+    if 'needs_lessons' not in keys or teacher['needs_lessons']:
+        pairs.append((f'teacher_need_lessons_{tid}', '1'))
+    if include_limits:
+        for column, field in (('min_lessons', 'teacher_min'), ('max_lessons', 'teacher_max')):
+            if column in keys and teacher[column] is not None:
+                pairs.append((f'{field}_{tid}', str(teacher[column])))
+    return pairs
+
+
+def _teacher_edit_pairs(config_row, teacher_row):
+    pairs = _config_pairs(config_row)
+    pairs.extend(_teacher_pairs(teacher_row))
+    return pairs
 
 
 def _teacher_edit_form(config_row, teacher_row):
-    data = _valid_config_form(config_row)
-    tid = teacher_row['id']
-    data.add('teacher_id', str(tid))
-    data.add(f'teacher_name_{tid}', teacher_row['name'])
-    for subj_id in json.loads(teacher_row['subjects']):
-        data.add(f'teacher_subjects_{tid}', str(subj_id))
-    needs_lessons = teacher_row['needs_lessons'] if 'needs_lessons' in teacher_row.keys() else 1
-    if needs_lessons:
-        data.add(f'teacher_need_lessons_{tid}', '1')
-    return data
+    return MultiDict(_teacher_edit_pairs(config_row, teacher_row))
 
 
-def _teachers_form(config_row, teacher_rows):
-    data = _valid_config_form(config_row)
-    for teacher in teacher_rows:
-        tid = teacher['id']
-        data.add('teacher_id', str(tid))
-        data.add(f'teacher_name_{tid}', teacher['name'])
-        for subj_id in json.loads(teacher['subjects']):
-            data.add(f'teacher_subjects_{tid}', str(subj_id))
-        needs_lessons = teacher.get('needs_lessons', 1)
-        if needs_lessons:
-            data.add(f'teacher_need_lessons_{tid}', '1')
-        if teacher.get('min_lessons') is not None:
-            data.add(f'teacher_min_{tid}', str(teacher['min_lessons']))
-        if teacher.get('max_lessons') is not None:
-            data.add(f'teacher_max_{tid}', str(teacher['max_lessons']))
-    return data
+def _override_form(base, **overrides):
+    """Return a ``MultiDict`` of ``base`` pairs with ``overrides`` replacing fields.
 
+    An override value may be a single value or a list of values.
+    """
+    pairs = [pair for pair in base if pair[0] not in overrides]
+    for key, value in overrides.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        pairs.extend((key, str(item)) for item in values)
+    return MultiDict(pairs)
 
-def _student_edit_form(config_row, student_row):
-    data = _valid_config_form(config_row)
-    sid = student_row['id']
-    data.add('student_id', str(sid))
-    data.add(f'student_name_{sid}', student_row['name'])
-    for subj_id in json.loads(student_row['subjects']):
-        data.add(f'student_subjects_{sid}', str(subj_id))
-    if student_row['active']:
-        data.add(f'student_active_{sid}', '1')
-    return data
 
+def _teachers_form(config_row, teacher_rows):
+    pairs = _config_pairs(config_row)
+    for teacher in teacher_rows:
+        pairs.extend(_teacher_pairs(teacher, include_limits=True))
+    return MultiDict(pairs)
 
-def _post_invalid_weight(tmp_path, field, value, expected_error, extra_updates=None):
-    import app
 
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
+def _student_pairs(student, locations=()):
+    """Return the form pairs describing one student row."""
+    sid = student['id']
+    pairs = [('student_id', str(sid)), (f'student_name_{sid}', student['name'])]
+    pairs.extend(
+        (f'student_subjects_{sid}', str(subj_id)) for subj_id in json.loads(student['subjects'])
+    )
+    if student['active']:
+        pairs.append((f'student_active_{sid}', '1'))
+    pairs.extend((f'student_locs_{sid}', str(loc_id)) for loc_id in locations)
+    return pairs
 
-    data = _valid_config_form(original)
-    if extra_updates:
-        for key, update in extra_updates.items():
-            if isinstance(update, (list, tuple)):
-                values = [str(item) for item in update]
-            else:
-                values = [str(update)]
-            data.setlist(key, values)
-    data.setlist(field, [str(value)])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+def _student_edit_form(config_row, student_row):
+    pairs = _config_pairs(config_row)
+    pairs.extend(_student_pairs(student_row))
+    return MultiDict(pairs)
 
-    assert response.status_code == 302
-    assert ('error', expected_error) in flashes
-    assert (
-        'error',
-        'Configuration not saved; changes have been rolled back.',
-    ) in flashes
-    assert _config_row(app.DB_PATH) == original
 
+def _students_form(config_row, student_rows, locations=None):
+    """Return a config form listing ``student_rows``.
 
-def test_reject_negative_consecutive_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'consecutive_weight',
-        '-1',
-        'Consecutive weight must be at least 1.',
-        extra_updates={'allow_repeats': '1', 'max_repeats': '2'},
-    )
+    ``locations`` optionally maps a student id to the location ids to submit.
+    """
+    locations = locations or {}
+    pairs = _config_pairs(config_row)
+    for student in student_rows:
+        pairs.extend(_student_pairs(student, sorted(locations.get(student['id'], ()))))
+    return MultiDict(pairs)
 
 
-def test_reject_non_numeric_consecutive_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'consecutive_weight',
-        'abc',
-        'Consecutive weight must be an integer.',
-        extra_updates={'allow_repeats': '1', 'max_repeats': '2'},
-    )
+def _group_pairs(group_id, name, subjects=(), members=()):
+    """Return the form pairs that edit existing group ``group_id``."""
+    pairs = [('group_id', str(group_id)), (f'group_name_{group_id}', name)]
+    pairs.extend((f'group_subjects_{group_id}', str(subj_id)) for subj_id in subjects)
+    pairs.extend((f'group_members_{group_id}', str(sid)) for sid in members)
+    return pairs
 
 
-def test_reject_negative_attendance_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'attendance_weight',
-        '-5',
-        'Attendance weight must be at least 1.',
-    )
+def _new_group_pairs(name, subjects=(), members=()):
+    """Return the form pairs that create a group called ``name``."""
+    pairs = [('new_group_name', name)]
+    pairs.extend(('new_group_subjects', str(subj_id)) for subj_id in subjects)
+    pairs.extend(('new_group_members', str(sid)) for sid in members)
+    return pairs
 
 
-def test_reject_non_numeric_attendance_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'attendance_weight',
-        'oops',
-        'Attendance weight must be an integer.',
-    )
+def _post_config(data):
+    """POST ``data`` to the config view and return the response and flashes.
 
+    Flashes are read straight from the session as ``(category, message)``
+    tuples, which is what ``get_flashed_messages(with_categories=True)``
+    returns, without its extra bookkeeping on ``g`` and the session. They
+    come back as a set because tests only check membership, never order.
+    """
+    with app.app.test_request_context('/config', method='POST', data=data):
+        response = app.config()
+        flashes = set(session.get('_flashes', ()))
+    return response, flashes
 
-def test_reject_negative_well_attend_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'well_attend_weight',
-        '-0.5',
-        'Well-attend weight must be zero or greater.',
-    )
 
+def _flashes_by_category(flashes):
+    """Group ``(category, message)`` flashes into lists keyed by category."""
+    by_category = defaultdict(list)
+    for category, message in flashes:
+        by_category[category].append(message)
+    return by_category
 
-def test_reject_non_numeric_well_attend_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'well_attend_weight',
-        'bad',
-        'Well-attend weight must be a number.',
-    )
 
+def _assert_flash(by_category, category, *needles):
+    """Assert that one ``category`` flash contains every string in ``needles``."""
+    assert any(
+        all(needle in message for needle in needles)
+        for message in by_category[category]
+    ), f'Expected a {category} flash containing {needles}, saw: {dict(by_category)}'
 
-def test_reject_negative_group_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'group_weight',
-        '-0.5',
-        'Group weight must be zero or greater.',
-    )
 
+def _post_invalid_weight(conn, field, value, expected_error, extra_updates=None):
+    original = _config_row(conn)
 
-def test_reject_non_numeric_group_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'group_weight',
-        'invalid',
-        'Group weight must be a number.',
+    data = _override_form(
+        _config_pairs(original),
+        **{**(extra_updates or {}), field: value},
     )
 
+    response, flashes = _post_config(data)
 
-def test_reject_negative_balance_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'balance_weight',
-        '-1',
-        'Balance weight must be at least 1.',
-    )
+    assert response.status_code == 302
+    assert ('error', expected_error) in flashes
+    assert (
+        'error',
+        'Configuration not saved; changes have been rolled back.',
+    ) in flashes
+    assert _config_values(conn) == tuple(original.values())
 
 
-def test_reject_non_numeric_balance_weight(tmp_path):
-    _post_invalid_weight(
-        tmp_path,
-        'balance_weight',
-        'nope',
-        'Balance weight must be an integer.',
-    )
+_REPEAT_UPDATES = {'allow_repeats': '1', 'max_repeats': '2'}
+
 
+@pytest.mark.parametrize(
+    'field, value, expected_error, extra_updates',
+    [
+        ('consecutive_weight', '-1', 'Consecutive weight must be at least 1.', _REPEAT_UPDATES),
+        ('consecutive_weight', 'abc', 'Consecutive weight must be an integer.', _REPEAT_UPDATES),
+        ('attendance_weight', '-5', 'Attendance weight must be at least 1.', None),
+        ('attendance_weight', 'oops', 'Attendance weight must be an integer.', None),
+        ('well_attend_weight', '-0.5', 'Well-attend weight must be zero or greater.', None),
+        ('well_attend_weight', 'bad', 'Well-attend weight must be a number.', None),
+        ('group_weight', '-0.5', 'Group weight must be zero or greater.', None),
+        ('group_weight', 'invalid', 'Group weight must be a number.', None),
+        ('balance_weight', '-1', 'Balance weight must be at least 1.', None),
+        ('balance_weight', 'nope', 'Balance weight must be an integer.', None),
+    ],
+)
+def test_reject_invalid_weight(db_conn, field, value, expected_error, extra_updates):
+    _post_invalid_weight(db_conn, field, value, expected_error, extra_updates=extra_updates)
 
-def test_reject_zero_slots_per_day(tmp_path):
-    import app
 
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
+def test_reject_zero_slots_per_day(db_conn):
+    original = _config_row(db_conn)
 
     data = MultiDict([
         ('slots_per_day', '0'),
         ('slot_duration', '30'),
     ])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert ('error', 'Slots per day and slot duration must be positive integers.') in flashes
-    assert _config_row(app.DB_PATH) == original
-
+    assert _config_values(db_conn) == tuple(original.values())
 
-def test_reject_negative_slot_duration(tmp_path):
-    import app
 
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
+def test_reject_negative_slot_duration(db_conn):
+    original = _config_row(db_conn)
 
     data = MultiDict([
         ('slots_per_day', '8'),
         ('slot_duration', '-5'),
     ])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert ('error', 'Slots per day and slot duration must be positive integers.') in flashes
-    assert _config_row(app.DB_PATH) == original
-
-
-def test_reject_negative_min_lessons(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
-
-    data = _valid_config_form(original)
-    data.setlist('min_lessons', ['-1'])
-
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
-
-    assert response.status_code == 302
-    assert ('error', 'Minimum and maximum lessons must be zero or greater.') in flashes
-    assert _config_row(app.DB_PATH) == original
-
-
-def test_reject_negative_max_lessons(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
+    assert _config_values(db_conn) == tuple(original.values())
+
+
+@pytest.mark.parametrize(
+    'field, expected_error',
+    [
+        ('min_lessons', 'Minimum and maximum lessons must be zero or greater.'),
+        ('max_lessons', 'Minimum and maximum lessons must be zero or greater.'),
+        (
+            'teacher_min_lessons',
+            'Global teacher minimum and maximum lessons must be zero or greater.',
+        ),
+    ],
+)
+def test_reject_negative_lessons(db_conn, field, expected_error):
+    original = _config_row(db_conn)
 
     data = _valid_config_form(original)
-    data.setlist('max_lessons', ['-3'])
+    data.setlist(field, ['-1'])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    assert ('error', 'Minimum and maximum lessons must be zero or greater.') in flashes
-    assert _config_row(app.DB_PATH) == original
-
-
-def test_reject_negative_teacher_lessons(tmp_path):
-    import app
+    assert ('error', expected_error) in flashes
+    assert _config_values(db_conn) == tuple(original.values())
 
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
 
-    data = _valid_config_form(original)
-    data.setlist('teacher_min_lessons', ['-1'])
+_STUDENT_WITH_UNAVAILABILITY_SQL = (
+    'SELECT s.*, u.slot AS unavailable_slot FROM students s '
+    'LEFT JOIN student_unavailable u ON u.student_id = s.id '
+    'WHERE s.id=? ORDER BY u.slot'
+)
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
 
-    assert response.status_code == 302
-    assert ('error', 'Global teacher minimum and maximum lessons must be zero or greater.') in flashes
-    assert _config_row(app.DB_PATH) == original
+def _student_with_unavailability(conn, student_id):
+    """Return a student's row and sorted unavailable slots in one query."""
+    rows = conn.execute(_STUDENT_WITH_UNAVAILABILITY_SQL, (student_id,)).fetchall()
+    slots = [row['unavailable_slot'] for row in rows if row['unavailable_slot'] is not None]
+    return rows[0], slots
 
 
-def test_reject_student_minimum_exceeding_available_slots(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-    student_row = conn.execute('SELECT * FROM students LIMIT 1').fetchone()
-    original_student = dict(student_row)
-    original_unavail = [
-        row['slot']
-        for row in conn.execute(
-            'SELECT slot FROM student_unavailable WHERE student_id=? ORDER BY slot',
-            (student_row['id'],),
-        )
-    ]
-    conn.close()
+def test_reject_student_minimum_exceeding_available_slots(db_conn):
+    conn = db_conn
+    config_row = _config_row(db_conn)
+    first_id = conn.execute('SELECT MIN(id) FROM students').fetchone()[0]
+    student_row, original_unavail = _student_with_unavailability(conn, first_id)
 
     data = _student_edit_form(config_row, student_row)
     sid = student_row['id']
@@ -372,9 +372,7 @@ def test_reject_student_minimum_exceeding_available_slots(tmp_path):
     data.setlist(f'student_max_{sid}', [str(config_row['slots_per_day'])])
     data.setlist(f'student_unavail_{sid}', blocked_slots)
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     expected = (
@@ -383,56 +381,36 @@ def test_reject_student_minimum_exceeding_available_slots(tmp_path):
     )
     assert expected in flashes
 
-    assert _config_row(app.DB_PATH) == config_row
+    assert _config_values(db_conn) == tuple(config_row.values())
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    updated = conn.execute('SELECT min_lessons, max_lessons FROM students WHERE id=?', (sid,)).fetchone()
-    updated_unavail = [
-        row['slot']
-        for row in conn.execute(
-            'SELECT slot FROM student_unavailable WHERE student_id=? ORDER BY slot',
-            (sid,),
-        )
-    ]
-    conn.close()
+    updated, updated_unavail = _student_with_unavailability(db_conn, sid)
 
-    assert updated['min_lessons'] == original_student['min_lessons']
-    assert updated['max_lessons'] == original_student['max_lessons']
+    assert updated['min_lessons'] == student_row['min_lessons']
+    assert updated['max_lessons'] == student_row['max_lessons']
     assert updated_unavail == original_unavail
 
 
-def test_allow_repeats_without_multi_teacher(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
+def test_allow_repeats_without_multi_teacher(db_conn):
+    original = _config_row(db_conn)
 
     data = _valid_config_form(original)
     data.add('allow_repeats', '1')
     data.pop('allow_multi_teacher', None)
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert (
         'error',
         'Cannot allow repeats when different teachers per subject are disallowed.',
     ) not in flashes
-    updated = _config_row(app.DB_PATH)
+    updated = _config_row(db_conn)
     assert updated['allow_repeats'] == 1
     assert updated['allow_multi_teacher'] == 0
 
 
-def test_reject_repeat_settings_when_repeats_disabled(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
+def test_reject_repeat_settings_when_repeats_disabled(db_conn):
+    original = _config_row(db_conn)
 
     data = _valid_config_form(original)
     data.pop('allow_repeats', None)
@@ -440,32 +418,27 @@ def test_reject_repeat_settings_when_repeats_disabled(tmp_path):
     data.setlist('consecutive_weight', ['2'])
     data.setlist('allow_consecutive', ['1'])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     expected = 'Repeated lesson settings require "Allow repeated lessons?" to be enabled.'
     assert ('error', expected) in flashes
-    updated = _config_row(app.DB_PATH)
+    updated = _config_row(db_conn)
     assert updated['allow_repeats'] == original['allow_repeats']
     assert updated['max_repeats'] == original['max_repeats']
     assert updated['allow_consecutive'] == original['allow_consecutive']
     assert updated['consecutive_weight'] == original['consecutive_weight']
 
 
-def test_disable_repeats_without_repeat_inputs(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
+def test_disable_repeats_without_repeat_inputs(db_conn):
+    conn = db_conn
     conn.execute(
         'UPDATE config SET allow_repeats=1, max_repeats=4, allow_consecutive=1, '
         'prefer_consecutive=1, consecutive_weight=5 WHERE id=1'
     )
     conn.commit()
-    conn.close()
 
-    original = _config_row(app.DB_PATH)
+    original = _config_row(db_conn)
     assert original['allow_repeats'] == 1
 
     data = _valid_config_form(original)
@@ -478,14 +451,12 @@ def test_disable_repeats_without_repeat_inputs(tmp_path):
     ):
         data.pop(field, None)
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert not any(category == 'error' for category, _ in flashes)
 
-    updated = _config_row(app.DB_PATH)
+    updated = _config_row(db_conn)
     assert updated['allow_repeats'] == 0
     assert updated['max_repeats'] == 1
     assert updated['allow_consecutive'] == 0
@@ -493,14 +464,8 @@ def test_disable_repeats_without_repeat_inputs(tmp_path):
     assert updated['consecutive_weight'] == 5
 
 
-def test_repeat_controls_render_disabled_when_repeats_off(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-
-    with app.app.test_client() as client:
-        response = client.get('/config')
+def test_repeat_controls_render_disabled_when_repeats_off(client):
+    response = client.get('/config')
 
     assert response.status_code == 200
     html = response.get_data(as_text=True)
@@ -508,27 +473,29 @@ def test_repeat_controls_render_disabled_when_repeats_off(tmp_path):
     class InputCollector(HTMLParser):
         def __init__(self):
             super().__init__()
-            self.inputs = []
+            self.inputs = {}
             self.labels = {}
 
         def handle_starttag(self, tag, attrs):
-            if tag != 'input':
-                if tag == 'label':
-                    attrs_dict = dict(attrs)
-                    target = attrs_dict.get('for')
-                    if target:
-                        self.labels[target] = attrs_dict
-                return
-            self.inputs.append(dict(attrs))
+            if tag == 'input':
+                attrs_dict = dict(attrs)
+                name = attrs_dict.get('name')
+                if name:
+                    self.inputs.setdefault(name, attrs_dict)
+            elif tag == 'label':
+                attrs_dict = dict(attrs)
+                target = attrs_dict.get('for')
+                if target:
+                    self.labels[target] = attrs_dict
 
     parser = InputCollector()
     parser.feed(html)
 
     def find_input(name):
-        for attrs in parser.inputs:
-            if attrs.get('name') == name:
-                return attrs
-        raise AssertionError(f'Could not find input named {name}')
+        attrs = parser.inputs.get(name)
+        if attrs is None:
+            raise AssertionError(f'Could not find input named {name}')
+        return attrs
 
     for field in ('max_repeats', 'allow_consecutive', 'prefer_consecutive'):
         attrs = find_input(field)
@@ -591,12 +558,12 @@ def test_student_consecutive_bonus_preserved_when_repeats_disabled():
     )
 
     proto = model.Proto()
-    var_names = {idx: var.name for idx, var in enumerate(proto.variables)}
-    adjacency_coeffs = {
-        var_names[idx]: coeff
-        for idx, coeff in zip(proto.objective.vars, proto.objective.coeffs)
-        if var_names[idx].startswith('adj_')
-    }
+    variables = proto.variables
+    adjacency_coeffs = {}
+    for idx, coeff in zip(proto.objective.vars, proto.objective.coeffs):
+        name = variables[idx].name
+        if name.startswith('adj_'):
+            adjacency_coeffs[name] = coeff
 
     assert adjacency_coeffs, 'Expected adjacency bonuses when a student prefers consecutive lessons'
     assert all(name.startswith('adj_s1') for name in adjacency_coeffs), (
@@ -606,226 +573,155 @@ def test_student_consecutive_bonus_preserved_when_repeats_disabled():
     assert all(coeff == expected_coeff for coeff in adjacency_coeffs.values())
 
 
-def test_reject_min_lessons_greater_than_max(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
+def test_reject_min_lessons_greater_than_max(db_conn):
+    original = _config_row(db_conn)
 
     data = _valid_config_form(original)
     data.setlist('min_lessons', [str(original['max_lessons'] + 1)])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert ('error', 'Minimum lessons cannot exceed maximum lessons.') in flashes
-    assert _config_row(app.DB_PATH) == original
-
-
-def test_reject_min_lessons_greater_than_slots(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
-
-    data = _valid_config_form(original)
-    slots = original['slots_per_day']
-    data.setlist('min_lessons', [str(slots + 1)])
-    data.setlist('max_lessons', [str(slots + 2)])
-
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
-
-    assert response.status_code == 302
-    assert ('error', 'Minimum lessons cannot exceed slots per day.') in flashes
-    assert _config_row(app.DB_PATH) == original
-
-
-def test_reject_max_lessons_greater_than_slots(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
+    assert _config_values(db_conn) == tuple(original.values())
+
+
+@pytest.mark.parametrize(
+    'offsets, expected_error',
+    [
+        (
+            {'min_lessons': 1, 'max_lessons': 2},
+            'Minimum lessons cannot exceed slots per day.',
+        ),
+        (
+            {'max_lessons': 1},
+            'Maximum lessons cannot exceed slots per day.',
+        ),
+        (
+            {'teacher_min_lessons': 1, 'teacher_max_lessons': 2},
+            'Global teacher minimum lessons cannot exceed slots per day.',
+        ),
+        (
+            {'teacher_max_lessons': 1},
+            'Global teacher maximum lessons cannot exceed slots per day.',
+        ),
+    ],
+)
+def test_reject_lessons_greater_than_slots(db_conn, offsets, expected_error):
+    original = _config_row(db_conn)
 
     data = _valid_config_form(original)
     slots = original['slots_per_day']
-    data.setlist('max_lessons', [str(slots + 1)])
+    for field, offset in offsets.items():
+        data.setlist(field, [str(slots + offset)])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    assert ('error', 'Maximum lessons cannot exceed slots per day.') in flashes
-    assert _config_row(app.DB_PATH) == original
-
-
-def test_reject_teacher_min_lessons_greater_than_slots(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
-
-    data = _valid_config_form(original)
-    slots = original['slots_per_day']
-    data.setlist('teacher_min_lessons', [str(slots + 1)])
-    data.setlist('teacher_max_lessons', [str(slots + 2)])
-
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
-
-    assert response.status_code == 302
-    assert ('error', 'Global teacher minimum lessons cannot exceed slots per day.') in flashes
-    assert _config_row(app.DB_PATH) == original
-
-
-def test_reject_teacher_max_lessons_greater_than_slots(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    conn.close()
-    original = _config_row(app.DB_PATH)
-
-    data = _valid_config_form(original)
-    slots = original['slots_per_day']
-    data.setlist('teacher_max_lessons', [str(slots + 1)])
-
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
-
-    assert response.status_code == 302
-    assert ('error', 'Global teacher maximum lessons cannot exceed slots per day.') in flashes
-    assert _config_row(app.DB_PATH) == original
-
+    assert ('error', expected_error) in flashes
+    assert _config_values(db_conn) == tuple(original.values())
 
-def test_reject_teacher_individual_min_exceeding_slots(tmp_path):
-    import app
 
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_reject_teacher_individual_min_exceeding_slots(db_conn):
+    conn = db_conn
+    config_row = _config_row(db_conn)
     slots = config_row['slots_per_day']
 
     teacher = conn.execute(
         'SELECT id, name, subjects, min_lessons, max_lessons FROM teachers ORDER BY id LIMIT 1'
     ).fetchone()
-    conn.close()
 
-    data = _teacher_edit_form(config_row, teacher)
-    data.setlist(f'teacher_min_{teacher["id"]}', [str(slots + 1)])
+    data = _override_form(
+        _teacher_edit_pairs(config_row, teacher),
+        **{f'teacher_min_{teacher["id"]}': slots + 1},
+    )
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     expected = 'Teacher minimum lessons cannot exceed slots per day for ' + teacher['name'] + '.'
     assert ('error', expected) in flashes
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated = conn.execute(
         'SELECT min_lessons, max_lessons FROM teachers WHERE id=?',
         (teacher['id'],),
     ).fetchone()
-    conn.close()
 
     assert updated['min_lessons'] == teacher['min_lessons']
     assert updated['max_lessons'] == teacher['max_lessons']
 
 
-def test_reject_teacher_individual_max_exceeding_slots(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_reject_teacher_individual_max_exceeding_slots(db_conn):
+    conn = db_conn
+    config_row = _config_row(db_conn)
     slots = config_row['slots_per_day']
 
     teacher = conn.execute(
         'SELECT id, name, subjects, min_lessons, max_lessons FROM teachers ORDER BY id LIMIT 1'
     ).fetchone()
-    conn.close()
 
-    data = _teacher_edit_form(config_row, teacher)
-    data.setlist(f'teacher_max_{teacher["id"]}', [str(slots + 2)])
+    data = _override_form(
+        _teacher_edit_pairs(config_row, teacher),
+        **{f'teacher_max_{teacher["id"]}': slots + 2},
+    )
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     expected = 'Teacher maximum lessons cannot exceed slots per day for ' + teacher['name'] + '.'
     assert ('error', expected) in flashes
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated = conn.execute(
         'SELECT min_lessons, max_lessons FROM teachers WHERE id=?',
         (teacher['id'],),
     ).fetchone()
-    conn.close()
 
     assert updated['min_lessons'] == teacher['min_lessons']
     assert updated['max_lessons'] == teacher['max_lessons']
 
 
-def test_reject_teacher_individual_min_greater_than_max(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_reject_teacher_individual_min_greater_than_max(db_conn):
+    conn = db_conn
+    config_row = _config_row(db_conn)
     slots = config_row['slots_per_day']
 
     teacher = conn.execute(
         'SELECT id, name, subjects, min_lessons, max_lessons FROM teachers ORDER BY id LIMIT 1'
     ).fetchone()
-    conn.close()
 
-    data = _teacher_edit_form(config_row, teacher)
-    data.setlist(f'teacher_min_{teacher["id"]}', [str(slots)])
-    data.setlist(f'teacher_max_{teacher["id"]}', [str(max(slots - 1, 0))])
+    data = _override_form(
+        _teacher_edit_pairs(config_row, teacher),
+        **{
+            f'teacher_min_{teacher["id"]}': slots,
+            f'teacher_max_{teacher["id"]}': max(slots - 1, 0),
+        },
+    )
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     expected = 'Teacher min lessons greater than max for ' + teacher['name']
     assert ('error', expected) in flashes
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated = conn.execute(
         'SELECT min_lessons, max_lessons FROM teachers WHERE id=?',
         (teacher['id'],),
     ).fetchone()
-    conn.close()
 
     assert updated['min_lessons'] == teacher['min_lessons']
     assert updated['max_lessons'] == teacher['max_lessons']
 
 
-def test_reject_teacher_unavailability_that_breaks_minimum(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
+def test_reject_teacher_unavailability_that_breaks_minimum(db_conn):
+    conn = db_conn
     teacher_row = conn.execute('SELECT id, name FROM teachers WHERE name=?', ('Teacher A',)).fetchone()
     assert teacher_row is not None
     original_unavailability = [
         (row['teacher_id'], row['slot'])
         for row in conn.execute('SELECT teacher_id, slot FROM teacher_unavailable').fetchall()
     ]
-    conn.close()
 
-    original_config = _config_row(app.DB_PATH)
+    original_config = _config_row(db_conn)
 
     data = _valid_config_form(original_config)
     data.setlist('teacher_min_lessons', ['5'])
@@ -833,32 +729,25 @@ def test_reject_teacher_unavailability_that_breaks_minimum(tmp_path):
     for slot in ['1', '2', '3', '4', '5']:
         data.add('new_unavail_slot', slot)
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     expected_message = (
         f"{teacher_row['name']} requires at least 5 lessons but only 3 slots remain after marking unavailability."
     )
     assert ('error', expected_message) in flashes
-    assert _config_row(app.DB_PATH) == original_config
+    assert _config_values(db_conn) == tuple(original_config.values())
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated_unavailability = [
         (row['teacher_id'], row['slot'])
         for row in conn.execute('SELECT teacher_id, slot FROM teacher_unavailable').fetchall()
     ]
-    conn.close()
     assert updated_unavailability == original_unavailability
 
 
-def test_warn_when_disabling_last_teacher_for_subject(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_warn_when_disabling_last_teacher_for_subject(db_conn):
+    conn = db_conn
+    config_row = _config_row(db_conn)
     teacher = conn.execute(
         'SELECT * FROM teachers WHERE name=?',
         ('Teacher B',),
@@ -885,44 +774,32 @@ def test_warn_when_disabling_last_teacher_for_subject(tmp_path):
     assert target_student is not None
     student_name = target_student['name']
 
-    conn.close()
 
     data = _teacher_edit_form(config_row, teacher)
     data.pop(f'teacher_need_lessons_{teacher["id"]}', None)
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     expected = (
         'warning',
-        f'No teacher scheduled for {subject_name} for student {student_name}; the solver will skip this subject.',
+        _NO_SCHEDULED_TEACHER_TMPL.format(subj=subject_name, name=student_name),
     )
     assert expected in flashes
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated = conn.execute(
         'SELECT needs_lessons FROM teachers WHERE id=?',
         (teacher['id'],),
     ).fetchone()
-    conn.close()
 
     assert updated['needs_lessons'] == 0
 
 
-def test_warn_when_disabling_last_teacher_for_group_subject(tmp_path):
-    import app
+def test_warn_when_disabling_last_teacher_for_group_subject(db_conn, subject_ids, student_ids):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-
-    subject_row = conn.execute(
-        'SELECT id, name FROM subjects WHERE name=?',
-        ('Science',),
-    ).fetchone()
-    assert subject_row is not None
+    subject_row = _seeded_subject(subject_ids, 'Science')
 
     teacher_row = conn.execute(
         'SELECT * FROM teachers WHERE name=?',
@@ -930,38 +807,29 @@ def test_warn_when_disabling_last_teacher_for_group_subject(tmp_path):
     ).fetchone()
     assert teacher_row is not None
 
-    member_rows = conn.execute(
-        'SELECT id, name FROM students WHERE name IN (?, ?)',
-        ('Student 2', 'Student 4'),
-    ).fetchall()
-    member_ids = [row['id'] for row in member_rows]
-    assert member_ids, 'Expected at least one student requiring Science'
+    member_names = ('Student 2', 'Student 4')
+    member_ids = [student_ids[name] for name in member_names]
 
     group_name = 'Science Group'
     cursor = conn.cursor()
     cursor.execute(
-        'INSERT INTO groups (name, subjects) VALUES (?, ?)',
+        _INSERT_GROUP_SQL,
         (group_name, json.dumps([subject_row['id']])),
     )
     group_id = cursor.lastrowid
-    for sid in member_ids:
-        cursor.execute(
-            'INSERT INTO group_members (group_id, student_id) VALUES (?, ?)',
-            (group_id, sid),
-        )
+    cursor.executemany(
+        _INSERT_GROUP_MEMBER_SQL,
+        [(group_id, sid) for sid in member_ids],
+    )
     conn.commit()
-    conn.close()
 
-    data = _teacher_edit_form(config_row, teacher_row)
-    data.pop(f'teacher_need_lessons_{teacher_row["id"]}', None)
-    data.add('group_id', str(group_id))
-    data.add(f'group_name_{group_id}', group_name)
-    data.setlist(f'group_subjects_{group_id}', [str(subject_row['id'])])
-    data.setlist(f'group_members_{group_id}', [str(sid) for sid in member_ids])
+    need_key = f'teacher_need_lessons_{teacher_row["id"]}'
+    data = MultiDict(
+        [pair for pair in _teacher_edit_pairs(config_row, teacher_row) if pair[0] != need_key]
+        + _group_pairs(group_id, group_name, [subject_row['id']], member_ids)
+    )
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert (
@@ -970,18 +838,16 @@ def test_warn_when_disabling_last_teacher_for_group_subject(tmp_path):
     ) in flashes
     expected_student_warning = (
         'warning',
-        f'No teacher scheduled for {subject_row["name"]} for student Student 2; the solver will skip this subject.',
+        _NO_SCHEDULED_TEACHER_TMPL.format(subj=subject_row["name"], name='Student 2'),
     )
     assert expected_student_warning in flashes
     expected_group_warning = (
         'warning',
-        f'No teacher scheduled for {subject_row["name"]} in group {group_name}; the solver will skip this subject.',
+        _NO_SCHEDULED_TEACHER_GROUP_TMPL.format(subj=subject_row["name"], name=group_name),
     )
     assert expected_group_warning in flashes
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated_teacher = conn.execute(
         'SELECT needs_lessons FROM teachers WHERE id=?',
         (teacher_row['id'],),
@@ -992,20 +858,13 @@ def test_warn_when_disabling_last_teacher_for_group_subject(tmp_path):
         (group_id,),
     ).fetchone()
     assert persisted_group is not None
-    conn.close()
 
 
-def test_student_validation_warns_when_all_teachers_blocked(tmp_path):
-    import app
+def test_student_validation_warns_when_all_teachers_blocked(db_conn, subject_ids):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-
-    subject_row = conn.execute(
-        'SELECT id, name FROM subjects WHERE name=?',
-        ('Science',),
-    ).fetchone()
-    assert subject_row is not None
+    subject_row = _seeded_subject(subject_ids, 'Science')
 
     teacher_row = conn.execute(
         'SELECT id FROM teachers WHERE name=?',
@@ -1020,18 +879,15 @@ def test_student_validation_warns_when_all_teachers_blocked(tmp_path):
     assert student_row is not None
 
     conn.execute(
-        'INSERT INTO student_teacher_block (student_id, teacher_id) VALUES (?, ?)',
+        _INSERT_STUDENT_TEACHER_BLOCK_SQL,
         (student_row['id'], teacher_row['id']),
     )
     conn.commit()
-    conn.close()
 
     data = _valid_config_form(config_row)
     data.setlist('solver_time_limit', ['135'])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert (
@@ -1040,28 +896,22 @@ def test_student_validation_warns_when_all_teachers_blocked(tmp_path):
     ) in flashes
     expected_warning = (
         'warning',
-        f'No teacher available for {subject_row["name"]} for student {student_row["name"]}; the solver will skip this subject.',
+        _NO_TEACHER_TMPL.format(subj=subject_row["name"], name=student_row["name"]),
     )
     assert expected_warning in flashes
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    updated_config = _config_row(app.DB_PATH)
+    updated_config = _config_row(db_conn)
     assert updated_config['solver_time_limit'] == 135
 
 
-def test_config_updates_solver_backend(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-    conn.close()
+def test_config_updates_solver_backend(db_conn):
+    config_row = _config_row(db_conn)
 
     data = _valid_config_form(config_row)
     data.setlist('solver_backend', ['ortools'])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert (
@@ -1069,23 +919,17 @@ def test_config_updates_solver_backend(tmp_path):
         'Configuration saved successfully.',
     ) in flashes
 
-    updated = _config_row(app.DB_PATH)
+    updated = _config_row(db_conn)
     assert updated['solver_backend'] == 'ortools'
 
 
-def test_config_rejects_unknown_solver_backend(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    original = _config_row(app.DB_PATH)
-    conn.close()
+def test_config_rejects_unknown_solver_backend(db_conn):
+    original = _config_row(db_conn)
 
     data = _valid_config_form(original)
     data.setlist('solver_backend', ['unknown'])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert any(
@@ -1099,132 +943,70 @@ def test_config_rejects_unknown_solver_backend(tmp_path):
         'error',
         'Configuration not saved; changes have been rolled back.',
     ) in flashes
-    assert _config_row(app.DB_PATH)['solver_backend'] == original['solver_backend']
-
+    assert _config_row(db_conn)['solver_backend'] == original['solver_backend']
 
-def test_batch_subject_removal_auto_deletes_group(tmp_path):
-    import app
 
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_batch_subject_removal_auto_deletes_group(db_conn, subject_ids):
+    config_row = _config_row(db_conn)
 
-    math_row = conn.execute(
-        'SELECT id, name FROM subjects WHERE name=?',
-        ('Math',),
-    ).fetchone()
-    assert math_row is not None
+    math_row = _seeded_subject(subject_ids, 'Math')
 
-    student_rows = conn.execute(
+    student_rows = db_conn.execute(
         'SELECT * FROM students WHERE name IN (?, ?)',
         ('Student 1', 'Student 2'),
     ).fetchall()
     assert len(student_rows) == 2
 
     group_name = 'Math Club'
-    cursor = conn.cursor()
-    cursor.execute(
-        'INSERT INTO groups (name, subjects) VALUES (?, ?)',
-        (group_name, json.dumps([math_row['id']])),
-    )
-    group_id = cursor.lastrowid
-    for row in student_rows:
+    with db_conn:
+        cursor = db_conn.cursor()
         cursor.execute(
-            'INSERT INTO group_members (group_id, student_id) VALUES (?, ?)',
-            (group_id, row['id']),
+            _INSERT_GROUP_SQL,
+            (group_name, json.dumps([math_row['id']])),
+        )
+        group_id = cursor.lastrowid
+        cursor.executemany(
+            _INSERT_GROUP_MEMBER_SQL,
+            [(group_id, row['id']) for row in student_rows],
         )
-    conn.commit()
-    conn.close()
-
-    data = _valid_config_form(config_row)
-    for row in student_rows:
-        sid = row['id']
-        data.add('student_id', str(sid))
-        data.add(f'student_name_{sid}', row['name'])
-        for subj_id in json.loads(row['subjects']):
-            data.add(f'student_subjects_{sid}', str(subj_id))
-        if row['active']:
-            data.add(f'student_active_{sid}', '1')
-
-    data.add('group_id', str(group_id))
-    data.add(f'group_name_{group_id}', group_name)
-    data.setlist(f'group_subjects_{group_id}', [str(math_row['id'])])
-    data.setlist(
-        f'group_members_{group_id}',
-        [str(row['id']) for row in student_rows],
-    )
 
     # Remove Math from Student 2 via the batch subject controls.
     student_ids = sorted(row['id'] for row in student_rows)
-    data.setlist('batch_students', [str(sid) for sid in student_ids])
-    data.add('batch_subject_action', 'remove')
-    data.add('batch_subjects', str(math_row['id']))
+    data = MultiDict(
+        list(_students_form(config_row, student_rows).items(multi=True))
+        + _group_pairs(
+            group_id, group_name, [math_row['id']], [row['id'] for row in student_rows]
+        )
+        + [('batch_students', str(sid)) for sid in student_ids]
+        + [('batch_subject_action', 'remove'), ('batch_subjects', str(math_row['id']))]
+    )
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
-    removal_notice = [
-        message
-        for category, message in flashes
-        if category == 'info'
-        and 'Removed Math' in message
-        and group_name in message
-    ]
-    assert removal_notice, f'Expected removal notice in flashes, saw: {flashes}'
-    auto_delete_notice = [
-        message
-        for category, message in flashes
-        if category == 'info'
-        and 'Auto-removed' in message
-        and group_name in message
-    ]
-    assert auto_delete_notice, f'Expected auto-removal notice, saw: {flashes}'
-
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    updated_group = conn.execute(
-        'SELECT 1 FROM groups WHERE id=?',
-        (group_id,),
-    ).fetchone()
-    assert updated_group is None
-    remaining_members = conn.execute(
-        'SELECT 1 FROM group_members WHERE group_id=?',
-        (group_id,),
-    ).fetchone()
-    assert remaining_members is None
-    remaining_locations = conn.execute(
-        'SELECT 1 FROM group_locations WHERE group_id=?',
-        (group_id,),
-    ).fetchone()
-    assert remaining_locations is None
-    updated_students = conn.execute(
+    assert 'error' not in {category for category, _ in flashes}
+    by_category = _flashes_by_category(flashes)
+    _assert_flash(by_category, 'info', 'Removed Math', group_name)
+    _assert_flash(by_category, 'info', 'Auto-removed', group_name)
+
+    leftovers = db_conn.execute(_GROUP_LEFTOVERS_SQL, (group_id,) * 3).fetchall()
+    assert not leftovers, f'Group rows left behind in: {[row[0] for row in leftovers]}'
+    updated_students = db_conn.execute(
         'SELECT id, subjects FROM students WHERE id IN (?, ?)',
         tuple(student_ids),
     ).fetchall()
-    conn.close()
 
     subjects_by_id = {row['id']: json.loads(row['subjects']) for row in updated_students}
     assert math_row['id'] not in subjects_by_id[student_ids[0]]
     assert math_row['id'] not in subjects_by_id[student_ids[1]]
 
 
-def test_batch_subject_removal_clears_group_fixed_assignments(tmp_path):
-    import app
+def test_batch_subject_removal_clears_group_fixed_assignments(db_conn, subject_ids):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-
-    math_row = conn.execute(
-        'SELECT id, name FROM subjects WHERE name=?',
-        ('Math',),
-    ).fetchone()
-    science_row = conn.execute(
-        'SELECT id, name FROM subjects WHERE name=?',
-        ('Science',),
-    ).fetchone()
-    assert math_row is not None and science_row is not None
+    math_row = _seeded_subject(subject_ids, 'Math')
+    science_row = _seeded_subject(subject_ids, 'Science')
 
     student_rows = conn.execute(
         'SELECT * FROM students WHERE name IN (?, ?)',
@@ -1232,87 +1014,55 @@ def test_batch_subject_removal_clears_group_fixed_assignments(tmp_path):
     ).fetchall()
     assert len(student_rows) == 2
 
-    group_name = 'STEM Club'
-    cursor = conn.cursor()
-    cursor.execute(
-        'INSERT INTO groups (name, subjects) VALUES (?, ?)',
-        (group_name, json.dumps([math_row['id'], science_row['id']])),
-    )
-    group_id = cursor.lastrowid
-    for row in student_rows:
-        cursor.execute(
-            'INSERT INTO group_members (group_id, student_id) VALUES (?, ?)',
-            (group_id, row['id']),
-        )
-
     teacher_row = conn.execute(
         'SELECT id FROM teachers WHERE name=?',
         ('Teacher B',),
     ).fetchone()
     assert teacher_row is not None
 
-    cursor.execute(
-        'INSERT INTO fixed_assignments (teacher_id, student_id, group_id, subject_id, slot) '
-        'VALUES (?, NULL, ?, ?, 0)',
-        (teacher_row['id'], group_id, science_row['id']),
-    )
-    conn.commit()
-    conn.close()
+    group_name = 'STEM Club'
+    group_subjects = [math_row['id'], science_row['id']]
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            _INSERT_GROUP_SQL,
+            (group_name, json.dumps(group_subjects)),
+        )
+        group_id = cursor.lastrowid
+        cursor.executemany(
+            _INSERT_GROUP_MEMBER_SQL,
+            [(group_id, row['id']) for row in student_rows],
+        )
 
-    data = _valid_config_form(config_row)
-    for row in student_rows:
-        sid = row['id']
-        data.add('student_id', str(sid))
-        data.add(f'student_name_{sid}', row['name'])
-        for subj_id in json.loads(row['subjects']):
-            data.add(f'student_subjects_{sid}', str(subj_id))
-        if row['active']:
-            data.add(f'student_active_{sid}', '1')
-
-    data.add('group_id', str(group_id))
-    data.add(f'group_name_{group_id}', group_name)
-    data.setlist(
-        f'group_subjects_{group_id}',
-        [str(math_row['id']), str(science_row['id'])],
-    )
-    data.setlist(
-        f'group_members_{group_id}',
-        [str(row['id']) for row in student_rows],
-    )
+        cursor.execute(
+            'INSERT INTO fixed_assignments (teacher_id, student_id, group_id, subject_id, slot) '
+            'VALUES (?, NULL, ?, ?, 0)',
+            (teacher_row['id'], group_id, science_row['id']),
+        )
 
     student_two = next(row for row in student_rows if row['name'] == 'Student 2')
-    data.setlist('batch_students', [str(student_two['id'])])
-    data.add('batch_subject_action', 'remove')
-    data.add('batch_subjects', str(science_row['id']))
+    data = MultiDict(
+        list(_students_form(config_row, student_rows).items(multi=True))
+        + _group_pairs(
+            group_id, group_name, group_subjects, [row['id'] for row in student_rows]
+        )
+        + [
+            ('batch_students', str(student_two['id'])),
+            ('batch_subject_action', 'remove'),
+            ('batch_subjects', str(science_row['id'])),
+        ]
+    )
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    removal_notice = [
-        message
-        for category, message in flashes
-        if category == 'info'
-        and f'Removed {science_row["name"]}' in message
-        and group_name in message
-    ]
-    assert removal_notice, f'Expected subject removal notice, saw: {flashes}'
+    by_category = _flashes_by_category(flashes)
+    _assert_flash(by_category, 'info', f'Removed {science_row["name"]}', group_name)
 
-    fixed_notice = [
-        message
-        for category, message in flashes
-        if category == 'info'
-        and 'Removed fixed assignments' in message
-        and science_row['name'] in message
-        and group_name in message
-    ]
-    assert fixed_notice, f'Expected fixed-assignment removal notice, saw: {flashes}'
+    _assert_flash(by_category, 'info', 'Removed fixed assignments', science_row['name'], group_name)
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated_subjects = conn.execute(
         'SELECT subjects FROM groups WHERE id=?',
         (group_id,),
@@ -1323,16 +1073,13 @@ def test_batch_subject_removal_clears_group_fixed_assignments(tmp_path):
         'SELECT 1 FROM fixed_assignments WHERE group_id=? AND subject_id=?',
         (group_id, science_row['id']),
     ).fetchone()
-    conn.close()
 
     assert remaining_fixed is None
 
 
-def test_batch_location_add_and_remove(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_batch_location_add_and_remove(db_conn):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
     cursor = conn.cursor()
     cursor.execute('INSERT INTO locations (name) VALUES (?)', ('Room A',))
@@ -1342,7 +1089,7 @@ def test_batch_location_add_and_remove(tmp_path):
 
     student_rows = [
         dict(row)
-        for row in conn.execute(
+        for row in cursor.execute(
             'SELECT * FROM students WHERE name IN (?, ?)',
             ('Student 1', 'Student 2'),
         ).fetchall()
@@ -1354,39 +1101,25 @@ def test_batch_location_add_and_remove(tmp_path):
         (student_lookup['Student 1']['id'], room_a_id),
     )
     conn.commit()
-    conn.close()
 
-    data = _valid_config_form(config_row)
-    for row in student_rows:
-        sid = row['id']
-        data.add('student_id', str(sid))
-        data.add(f'student_name_{sid}', row['name'])
-        for subj_id in json.loads(row['subjects']):
-            data.add(f'student_subjects_{sid}', str(subj_id))
-        if row['active']:
-            data.add(f'student_active_{sid}', '1')
-    data.setlist(f"student_locs_{student_lookup['Student 1']['id']}", [str(room_a_id)])
+    data = _students_form(
+        config_row,
+        student_rows,
+        locations={student_lookup['Student 1']['id']: [room_a_id]},
+    )
     batch_ids = [str(row['id']) for row in student_rows]
     data.setlist('batch_students', batch_ids)
     data.add('batch_location_action', 'add')
     data.setlist('batch_locations', [str(room_b_id)])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
-    added_notice = [
-        message
-        for category, message in flashes
-        if category == 'info' and 'Added' in message and 'Room B' in message
-    ]
-    assert added_notice, f'Expected added location notice, saw: {flashes}'
+    assert 'error' not in {category for category, _ in flashes}
+    by_category = _flashes_by_category(flashes)
+    _assert_flash(by_category, 'info', 'Added', 'Room B')
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    location_rows = conn.execute(
+    location_rows = cursor.execute(
         'SELECT student_id, location_id FROM student_locations WHERE student_id IN (?, ?)',
         (student_lookup['Student 1']['id'], student_lookup['Student 2']['id']),
     ).fetchall()
@@ -1396,39 +1129,19 @@ def test_batch_location_add_and_remove(tmp_path):
     assert location_by_student.get(student_lookup['Student 1']['id'], set()) == {room_a_id, room_b_id}
     assert location_by_student.get(student_lookup['Student 2']['id'], set()) == {room_b_id}
 
-    data_remove = _valid_config_form(config_row)
-    for row in student_rows:
-        sid = row['id']
-        data_remove.add('student_id', str(sid))
-        data_remove.add(f'student_name_{sid}', row['name'])
-        for subj_id in json.loads(row['subjects']):
-            data_remove.add(f'student_subjects_{sid}', str(subj_id))
-        if row['active']:
-            data_remove.add(f'student_active_{sid}', '1')
-        current_locations = sorted(location_by_student.get(sid, set()))
-        if current_locations:
-            data_remove.setlist(
-                f'student_locs_{sid}',
-                [str(loc_id) for loc_id in current_locations],
-            )
+    data_remove = _students_form(config_row, student_rows, locations=location_by_student)
     data_remove.setlist('batch_students', [str(student_lookup['Student 1']['id'])])
     data_remove.add('batch_location_action', 'remove')
     data_remove.setlist('batch_locations', [str(room_b_id)])
 
-    with app.app.test_request_context('/config', method='POST', data=data_remove):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data_remove)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
-    removed_notice = [
-        message
-        for category, message in flashes
-        if category == 'info' and 'Removed' in message and 'Room B' in message
-    ]
-    assert removed_notice, f'Expected removed location notice, saw: {flashes}'
+    assert 'error' not in {category for category, _ in flashes}
+    by_category = _flashes_by_category(flashes)
+    _assert_flash(by_category, 'info', 'Removed', 'Room B')
 
-    updated_rows = conn.execute(
+    updated_rows = cursor.execute(
         'SELECT student_id, location_id FROM student_locations WHERE student_id IN (?, ?)',
         (student_lookup['Student 1']['id'], student_lookup['Student 2']['id']),
     ).fetchall()
@@ -1437,16 +1150,12 @@ def test_batch_location_add_and_remove(tmp_path):
         updated_locations.setdefault(row['student_id'], set()).add(row['location_id'])
     assert updated_locations.get(student_lookup['Student 1']['id'], set()) == {room_a_id}
     assert updated_locations.get(student_lookup['Student 2']['id'], set()) == {room_b_id}
-    conn.close()
-
 
-def test_batch_active_toggle(tmp_path):
-    import app
 
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_batch_active_toggle(db_conn):
+    config_row = _config_row(db_conn)
 
-    cursor = conn.cursor()
+    cursor = db_conn.cursor()
     student_rows = [
         dict(row)
         for row in cursor.execute(
@@ -1455,35 +1164,18 @@ def test_batch_active_toggle(tmp_path):
         ).fetchall()
     ]
     assert len(student_rows) == 2
-    conn.close()
-
-    def _build_student_payload(students):
-        data = _valid_config_form(config_row)
-        for row in students:
-            sid = row['id']
-            data.add('student_id', str(sid))
-            data.add(f'student_name_{sid}', row['name'])
-            for subj_id in json.loads(row['subjects']):
-                data.add(f'student_subjects_{sid}', str(subj_id))
-            if row['active']:
-                data.add(f'student_active_{sid}', '1')
-        return data
 
     student_ids = [row['id'] for row in student_rows]
-    deactivate_data = _build_student_payload(student_rows)
+    deactivate_data = _students_form(config_row, student_rows)
     deactivate_data.setlist('batch_students', [str(sid) for sid in student_ids])
     deactivate_data.add('batch_active_action', 'deactivate')
 
-    with app.app.test_request_context('/config', method='POST', data=deactivate_data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(deactivate_data)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    inactive_rows = conn.execute(
+    inactive_rows = db_conn.execute(
         'SELECT id, active FROM students WHERE id IN (?, ?)',
         (student_ids[0], student_ids[1]),
     ).fetchall()
@@ -1491,60 +1183,46 @@ def test_batch_active_toggle(tmp_path):
 
     refreshed_rows = [
         dict(row)
-        for row in conn.execute(
+        for row in db_conn.execute(
             'SELECT * FROM students WHERE id IN (?, ?)',
             (student_ids[0], student_ids[1]),
         ).fetchall()
     ]
-    conn.close()
 
-    activate_data = _build_student_payload(refreshed_rows)
+    activate_data = _students_form(config_row, refreshed_rows)
     activate_data.setlist('batch_students', [str(sid) for sid in student_ids])
     activate_data.add('batch_active_action', 'activate')
 
-    with app.app.test_request_context('/config', method='POST', data=activate_data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(activate_data)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    active_rows = conn.execute(
+    active_rows = db_conn.execute(
         'SELECT id, active FROM students WHERE id IN (?, ?)',
         (student_ids[0], student_ids[1]),
     ).fetchall()
-    conn.close()
 
     assert all(row['active'] == 1 for row in active_rows)
 
 
-def test_batch_teacher_subject_add(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-
-    subject_rows = conn.execute('SELECT id, name FROM subjects').fetchall()
-    subject_lookup = {row['name']: row['id'] for row in subject_rows}
-    required_subjects = {'Math', 'Science', 'English'}
-    missing = required_subjects - subject_lookup.keys()
-    assert not missing, f'Missing expected subjects: {missing}'
+def test_batch_teacher_subject_add(db_conn, subject_ids):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
     teacher_specs = [
         ('Batch Teacher 1', ['Math'], 1),
         ('Batch Teacher 2', ['Science'], 1),
         ('Batch Teacher 3', ['Math'], 1),
     ]
-    cursor = conn.cursor()
-    for name, subject_names, needs_lessons in teacher_specs:
-        subject_ids = [subject_lookup[sub] for sub in subject_names]
-        cursor.execute(
-            'INSERT INTO teachers (name, subjects, min_lessons, max_lessons, needs_lessons) VALUES (?, ?, ?, ?, ?)',
-            (name, json.dumps(subject_ids), None, None, needs_lessons),
+    with conn:
+        conn.executemany(
+            _INSERT_TEACHER_SQL,
+            [
+                (name, json.dumps([subject_ids[sub] for sub in subject_names]), None, None, needs_lessons)
+                for name, subject_names, needs_lessons in teacher_specs
+            ],
         )
-    conn.commit()
 
     teacher_rows = [
         dict(row)
@@ -1557,9 +1235,8 @@ def test_batch_teacher_subject_add(tmp_path):
         row['id']: set(json.loads(row['subjects']))
         for row in teacher_rows
     }
-    conn.close()
 
-    english_id = subject_lookup['English']
+    english_id = subject_ids['English']
     selected_ids = [teacher_rows[0]['id'], teacher_rows[1]['id']]
 
     data = _teachers_form(config_row, teacher_rows)
@@ -1568,20 +1245,15 @@ def test_batch_teacher_subject_add(tmp_path):
     data.setlist('batch_teacher_subjects', [str(english_id)])
     data.add('batch_teacher_need_action', 'no-change')
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated_rows = conn.execute(
         'SELECT id, subjects FROM teachers WHERE id IN (?, ?, ?)',
         (teacher_rows[0]['id'], teacher_rows[1]['id'], teacher_rows[2]['id']),
     ).fetchall()
-    conn.close()
 
     updated_subjects = {
         row['id']: set(json.loads(row['subjects']))
@@ -1594,31 +1266,23 @@ def test_batch_teacher_subject_add(tmp_path):
     assert updated_subjects[untouched_id] == original_subjects[untouched_id]
 
 
-def test_batch_teacher_subject_remove(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-
-    subject_rows = conn.execute('SELECT id, name FROM subjects').fetchall()
-    subject_lookup = {row['name']: row['id'] for row in subject_rows}
-    required_subjects = {'Math', 'Science', 'English'}
-    missing = required_subjects - subject_lookup.keys()
-    assert not missing, f'Missing expected subjects: {missing}'
+def test_batch_teacher_subject_remove(db_conn, subject_ids):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
     teacher_specs = [
         ('Remove Teacher 1', ['Math', 'Science'], 1),
         ('Remove Teacher 2', ['Science', 'English'], 1),
         ('Remove Teacher 3', ['Math'], 1),
     ]
-    cursor = conn.cursor()
-    for name, subject_names, needs_lessons in teacher_specs:
-        subject_ids = [subject_lookup[sub] for sub in subject_names]
-        cursor.execute(
-            'INSERT INTO teachers (name, subjects, min_lessons, max_lessons, needs_lessons) VALUES (?, ?, ?, ?, ?)',
-            (name, json.dumps(subject_ids), None, None, needs_lessons),
+    with conn:
+        conn.executemany(
+            _INSERT_TEACHER_SQL,
+            [
+                (name, json.dumps([subject_ids[sub] for sub in subject_names]), None, None, needs_lessons)
+                for name, subject_names, needs_lessons in teacher_specs
+            ],
         )
-    conn.commit()
 
     teacher_rows = [
         dict(row)
@@ -1631,9 +1295,8 @@ def test_batch_teacher_subject_remove(tmp_path):
         row['id']: set(json.loads(row['subjects']))
         for row in teacher_rows
     }
-    conn.close()
 
-    science_id = subject_lookup['Science']
+    science_id = subject_ids['Science']
     selected_ids = [teacher_rows[0]['id'], teacher_rows[1]['id']]
 
     data = _teachers_form(config_row, teacher_rows)
@@ -1641,20 +1304,15 @@ def test_batch_teacher_subject_remove(tmp_path):
     data.add('batch_teacher_subject_action', 'remove')
     data.setlist('batch_teacher_subjects', [str(science_id)])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated_rows = conn.execute(
         'SELECT id, subjects FROM teachers WHERE id IN (?, ?, ?)',
         (teacher_rows[0]['id'], teacher_rows[1]['id'], teacher_rows[2]['id']),
     ).fetchall()
-    conn.close()
 
     updated_subjects = {
         row['id']: set(json.loads(row['subjects']))
@@ -1668,56 +1326,44 @@ def test_batch_teacher_subject_remove(tmp_path):
     assert updated_subjects[untouched_id] == original_subjects[untouched_id]
 
 
-def test_batch_teacher_need_toggle(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-
-    subject_rows = conn.execute('SELECT id, name FROM subjects').fetchall()
-    subject_lookup = {row['name']: row['id'] for row in subject_rows}
-    assert 'Math' in subject_lookup, 'Expected Math subject to be present'
+def test_batch_teacher_need_toggle(db_conn, subject_ids):
+    config_row = _config_row(db_conn)
 
     teacher_specs = [
         ('Toggle Teacher 1', ['Math'], 1),
         ('Toggle Teacher 2', ['Math'], 1),
         ('Toggle Teacher 3', ['Math'], 0),
     ]
-    cursor = conn.cursor()
-    for name, subject_names, needs_lessons in teacher_specs:
-        subject_ids = [subject_lookup[sub] for sub in subject_names]
-        cursor.execute(
-            'INSERT INTO teachers (name, subjects, min_lessons, max_lessons, needs_lessons) VALUES (?, ?, ?, ?, ?)',
-            (name, json.dumps(subject_ids), None, None, needs_lessons),
+    with db_conn:
+        db_conn.executemany(
+            _INSERT_TEACHER_SQL,
+            [
+                (name, json.dumps([subject_ids[sub] for sub in subject_names]), None, None, needs_lessons)
+                for name, subject_names, needs_lessons in teacher_specs
+            ],
         )
-    conn.commit()
 
     teacher_rows = [
         dict(row)
-        for row in conn.execute(
+        for row in db_conn.execute(
             'SELECT * FROM teachers WHERE name IN (?, ?, ?)',
             tuple(spec[0] for spec in teacher_specs),
         ).fetchall()
     ]
-    conn.close()
 
     first_pass_ids = [teacher_rows[0]['id'], teacher_rows[1]['id']]
     data = _teachers_form(config_row, teacher_rows)
     data.setlist('batch_teachers', [str(tid) for tid in first_pass_ids])
     data.add('batch_teacher_need_action', 'deactivate')
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     status_after_first = {
         row['id']: row['needs_lessons']
-        for row in conn.execute(
+        for row in db_conn.execute(
             'SELECT id, needs_lessons FROM teachers WHERE id IN (?, ?, ?)',
             (teacher_rows[0]['id'], teacher_rows[1]['id'], teacher_rows[2]['id']),
         ).fetchall()
@@ -1729,47 +1375,39 @@ def test_batch_teacher_need_toggle(tmp_path):
 
     refreshed_teachers = [
         dict(row)
-        for row in conn.execute(
+        for row in db_conn.execute(
             'SELECT * FROM teachers WHERE id IN (?, ?, ?)',
             (teacher_rows[0]['id'], teacher_rows[1]['id'], teacher_rows[2]['id']),
         ).fetchall()
     ]
-    conn.close()
 
-    config_row = _config_row(app.DB_PATH)
+    config_row = _config_row(db_conn)
     second_pass_ids = [teacher_rows[1]['id'], teacher_rows[2]['id']]
     data_activate = _teachers_form(config_row, refreshed_teachers)
     data_activate.setlist('batch_teachers', [str(tid) for tid in second_pass_ids])
     data_activate.add('batch_teacher_need_action', 'activate')
 
-    with app.app.test_request_context('/config', method='POST', data=data_activate):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data_activate)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     final_status = {
         row['id']: row['needs_lessons']
-        for row in conn.execute(
+        for row in db_conn.execute(
             'SELECT id, needs_lessons FROM teachers WHERE id IN (?, ?, ?)',
             (teacher_rows[0]['id'], teacher_rows[1]['id'], teacher_rows[2]['id']),
         ).fetchall()
     }
-    conn.close()
 
     assert final_status[teacher_rows[0]['id']] == 0
     assert final_status[teacher_rows[1]['id']] == 1
     assert final_status[teacher_rows[2]['id']] == 1
 
 
-def test_followup_config_auto_removes_empty_group(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_followup_config_auto_removes_empty_group(db_conn):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
     student_rows = conn.execute(
         'SELECT id, name FROM students WHERE name IN (?, ?)',
@@ -1780,141 +1418,91 @@ def test_followup_config_auto_removes_empty_group(tmp_path):
     group_name = 'History Club'
     cursor = conn.cursor()
     cursor.execute(
-        'INSERT INTO groups (name, subjects) VALUES (?, ?)',
+        _INSERT_GROUP_SQL,
         (group_name, json.dumps([])),
     )
     group_id = cursor.lastrowid
-    for row in student_rows:
-        cursor.execute(
-            'INSERT INTO group_members (group_id, student_id) VALUES (?, ?)',
-            (group_id, row['id']),
-        )
+    cursor.executemany(
+        _INSERT_GROUP_MEMBER_SQL,
+        [(group_id, row['id']) for row in student_rows],
+    )
     conn.commit()
-    conn.close()
 
-    data = _valid_config_form(config_row)
-    data.add('group_id', str(group_id))
-    data.add(f'group_name_{group_id}', group_name)
-    data.setlist(
-        f'group_members_{group_id}',
-        [str(row['id']) for row in student_rows],
+    data = MultiDict(
+        _config_pairs(config_row)
+        + _group_pairs(group_id, group_name, members=[row['id'] for row in student_rows])
     )
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    assert all(category != 'error' for category, _ in flashes)
-    auto_delete_notice = [
-        message
-        for category, message in flashes
-        if category == 'info'
-        and 'Auto-removed' in message
-        and group_name in message
-    ]
-    assert auto_delete_notice, f'Expected auto-removal notice, saw: {flashes}'
+    assert 'error' not in {category for category, _ in flashes}
+    by_category = _flashes_by_category(flashes)
+    _assert_flash(by_category, 'info', 'Auto-removed', group_name)
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    assert (
-        conn.execute('SELECT 1 FROM groups WHERE id=?', (group_id,)).fetchone()
-        is None
-    )
-    assert (
-        conn.execute('SELECT 1 FROM group_members WHERE group_id=?', (group_id,)).fetchone()
-        is None
-    )
-    assert (
-        conn.execute('SELECT 1 FROM group_locations WHERE group_id=?', (group_id,)).fetchone()
-        is None
-    )
-    conn.close()
+    leftovers = conn.execute(_GROUP_LEFTOVERS_SQL, (group_id,) * 3).fetchall()
+    assert not leftovers, f'Group rows left behind in: {[row[0] for row in leftovers]}'
 
 
-def test_warn_when_creating_group_with_needs_lessons_disabled_teacher(tmp_path):
-    import app
+def test_warn_when_creating_group_with_needs_lessons_disabled_teacher(db_conn, subject_ids, student_ids):
+    conn = db_conn
+    cursor = conn.cursor()
+    config_row = _config_row(db_conn)
 
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+    subject_row = _seeded_subject(subject_ids, 'Science')
 
-    subject_row = conn.execute(
-        'SELECT id, name FROM subjects WHERE name=?',
-        ('Science',),
-    ).fetchone()
-    assert subject_row is not None
-
-    teacher_row = conn.execute(
+    teacher_row = cursor.execute(
         'SELECT * FROM teachers WHERE name=?',
         ('Teacher B',),
     ).fetchone()
     assert teacher_row is not None
 
-    member_rows = conn.execute(
-        'SELECT id, name FROM students WHERE name IN (?, ?)',
-        ('Student 2', 'Student 4'),
-    ).fetchall()
-    member_ids = [row['id'] for row in member_rows]
-    assert member_ids, 'Expected at least one student requiring Science'
-
-    conn.close()
+    member_names = ('Student 2', 'Student 4')
+    member_ids = [student_ids[name] for name in member_names]
 
     disable_data = _teacher_edit_form(config_row, teacher_row)
     disable_data.pop(f'teacher_need_lessons_{teacher_row["id"]}', None)
 
-    with app.app.test_request_context('/config', method='POST', data=disable_data):
-        disable_response = app.config()
-        disable_flashes = get_flashed_messages(with_categories=True)
+    disable_response, disable_flashes = _post_config(disable_data)
 
     assert disable_response.status_code == 302
     student_warning = (
         'warning',
-        f'No teacher scheduled for {subject_row["name"]} for student Student 2; the solver will skip this subject.',
+        _NO_SCHEDULED_TEACHER_TMPL.format(subj=subject_row["name"], name='Student 2'),
     )
     assert student_warning in disable_flashes
 
-    updated_config = _config_row(app.DB_PATH)
+    updated_config = _config_row(db_conn)
 
-    create_data = _valid_config_form(updated_config)
     group_name = 'Science Warning Group'
-    create_data.add('new_group_name', group_name)
-    create_data.setlist('new_group_subjects', [str(subject_row['id'])])
-    create_data.setlist('new_group_members', [str(sid) for sid in member_ids])
+    create_data = MultiDict(
+        _config_pairs(updated_config)
+        + _new_group_pairs(group_name, [subject_row['id']], member_ids)
+    )
 
-    with app.app.test_request_context('/config', method='POST', data=create_data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(create_data)
 
     assert response.status_code == 302
     expected_group_warning = (
         'warning',
-        f'No teacher scheduled for {subject_row["name"]} in group {group_name}; the solver will skip this subject.',
+        _NO_SCHEDULED_TEACHER_GROUP_TMPL.format(subj=subject_row["name"], name=group_name),
     )
     assert expected_group_warning in flashes
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    persisted_group = conn.execute(
+    persisted_group = cursor.execute(
         'SELECT name FROM groups WHERE name=?',
         (group_name,),
     ).fetchone()
-    conn.close()
 
     assert persisted_group is not None
 
 
-def test_group_validation_warns_when_teacher_blocked_for_new_group(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_group_validation_warns_when_teacher_blocked_for_new_group(db_conn, subject_ids, student_ids):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
-    subject_row = conn.execute(
-        'SELECT id, name FROM subjects WHERE name=?',
-        ('Science',),
-    ).fetchone()
-    assert subject_row is not None
+    subject_row = _seeded_subject(subject_ids, 'Science')
 
     teacher_row = conn.execute(
         'SELECT id FROM teachers WHERE name=?',
@@ -1922,71 +1510,54 @@ def test_group_validation_warns_when_teacher_blocked_for_new_group(tmp_path):
     ).fetchone()
     assert teacher_row is not None
 
-    member_rows = conn.execute(
-        'SELECT id FROM students WHERE name IN (?, ?)',
-        ('Student 2', 'Student 4'),
-    ).fetchall()
-    member_ids = [row['id'] for row in member_rows]
-    assert member_ids, 'Expected at least one student requiring Science'
+    member_names = ('Student 2', 'Student 4')
+    member_ids = [student_ids[name] for name in member_names]
 
     groups_before = conn.execute('SELECT COUNT(*) FROM groups').fetchone()[0]
 
-    for sid in member_ids:
-        conn.execute(
-            'INSERT INTO student_teacher_block (student_id, teacher_id) VALUES (?, ?)',
-            (sid, teacher_row['id']),
-        )
+    conn.executemany(
+        _INSERT_STUDENT_TEACHER_BLOCK_SQL,
+        [(sid, teacher_row['id']) for sid in member_ids],
+    )
 
     conn.commit()
-    conn.close()
 
-    data = _valid_config_form(config_row)
     group_name = 'Science Blocked Group'
-    data.add('new_group_name', group_name)
-    data.setlist('new_group_subjects', [str(subject_row['id'])])
-    data.setlist('new_group_members', [str(sid) for sid in member_ids])
+    data = MultiDict(
+        _config_pairs(config_row)
+        + _new_group_pairs(group_name, [subject_row['id']], member_ids)
+    )
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     student_warning = (
         'warning',
-        f'No teacher available for {subject_row["name"]} for student Student 2; the solver will skip this subject.',
+        _NO_TEACHER_TMPL.format(subj=subject_row["name"], name='Student 2'),
     )
     assert student_warning in flashes
     group_warning = (
         'warning',
-        f'No teacher available for {subject_row["name"]} in group {group_name}; the solver will skip this subject.',
+        _NO_TEACHER_GROUP_TMPL.format(subj=subject_row["name"], name=group_name),
     )
     assert group_warning in flashes
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     groups_after = conn.execute('SELECT COUNT(*) FROM groups').fetchone()[0]
     persisted_group = conn.execute(
         'SELECT name FROM groups WHERE name=?',
         (group_name,),
     ).fetchone()
-    conn.close()
 
     assert groups_after == groups_before + 1
     assert persisted_group is not None
 
 
-def test_group_validation_warns_when_teacher_blocked_for_existing_group(tmp_path):
-    import app
+def test_group_validation_warns_when_teacher_blocked_for_existing_group(db_conn, subject_ids, student_ids):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-
-    subject_row = conn.execute(
-        'SELECT id, name FROM subjects WHERE name=?',
-        ('Science',),
-    ).fetchone()
-    assert subject_row is not None
+    subject_row = _seeded_subject(subject_ids, 'Science')
 
     teacher_row = conn.execute(
         'SELECT id FROM teachers WHERE name=?',
@@ -1994,78 +1565,63 @@ def test_group_validation_warns_when_teacher_blocked_for_existing_group(tmp_path
     ).fetchone()
     assert teacher_row is not None
 
-    member_rows = conn.execute(
-        'SELECT id, name FROM students WHERE name IN (?, ?)',
-        ('Student 2', 'Student 4'),
-    ).fetchall()
-    member_ids = [row['id'] for row in member_rows]
-    assert member_ids, 'Expected at least one student requiring Science'
+    member_names = ('Student 2', 'Student 4')
+    member_ids = [student_ids[name] for name in member_names]
 
     group_name = 'Science Blocked Existing'
     cursor = conn.cursor()
     cursor.execute(
-        'INSERT INTO groups (name, subjects) VALUES (?, ?)',
+        _INSERT_GROUP_SQL,
         (group_name, json.dumps([subject_row['id']])),
     )
     group_id = cursor.lastrowid
-    for sid in member_ids:
-        cursor.execute(
-            'INSERT INTO group_members (group_id, student_id) VALUES (?, ?)',
-            (group_id, sid),
-        )
+    cursor.executemany(
+        _INSERT_GROUP_MEMBER_SQL,
+        [(group_id, sid) for sid in member_ids],
+    )
     conn.commit()
 
-    for sid in member_ids:
-        conn.execute(
-            'INSERT INTO student_teacher_block (student_id, teacher_id) VALUES (?, ?)',
-            (sid, teacher_row['id']),
-        )
+    conn.executemany(
+        _INSERT_STUDENT_TEACHER_BLOCK_SQL,
+        [(sid, teacher_row['id']) for sid in member_ids],
+    )
 
     conn.commit()
-    conn.close()
 
-    data = _valid_config_form(config_row)
     new_name = 'Science Blocked Existing Updated'
-    data.add('group_id', str(group_id))
-    data.add(f'group_name_{group_id}', new_name)
-    data.setlist(f'group_subjects_{group_id}', [str(subject_row['id'])])
-    data.setlist(f'group_members_{group_id}', [str(sid) for sid in member_ids])
+    data = MultiDict(
+        _config_pairs(config_row)
+        + _group_pairs(group_id, new_name, [subject_row['id']], member_ids)
+    )
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    for member in member_rows:
+    for name in member_names:
         expected_student_warning = (
             'warning',
-            f'No teacher available for {subject_row["name"]} for student {member["name"]}; the solver will skip this subject.',
+            _NO_TEACHER_TMPL.format(subj=subject_row["name"], name=name),
         )
         assert expected_student_warning in flashes
     group_warning = (
         'warning',
-        f'No teacher available for {subject_row["name"]} in group {new_name}; the solver will skip this subject.',
+        _NO_TEACHER_GROUP_TMPL.format(subj=subject_row["name"], name=new_name),
     )
     assert group_warning in flashes
-    assert all(category != 'error' for category, _ in flashes)
+    assert 'error' not in {category for category, _ in flashes}
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     persisted_group = conn.execute(
         'SELECT name FROM groups WHERE id=?',
         (group_id,),
     ).fetchone()
-    conn.close()
 
     assert persisted_group is not None
     assert persisted_group['name'] == new_name
 
 
-def test_block_teacher_after_deleting_fixed_assignment(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_block_teacher_after_deleting_fixed_assignment(db_conn):
+    conn = db_conn
+    config_row = _config_row(db_conn)
 
     teacher_row = conn.execute(
         "SELECT id FROM teachers WHERE id=1",
@@ -2124,9 +1680,7 @@ def test_block_teacher_after_deleting_fixed_assignment(tmp_path):
     data.add("assign_id", str(assignment_row["id"]))
     data.add("assign_delete", str(assignment_row["id"]))
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert ('error', 'Cannot block selected teacher for student') not in flashes
@@ -2139,125 +1693,59 @@ def test_block_teacher_after_deleting_fixed_assignment(tmp_path):
         "SELECT COUNT(*) FROM student_teacher_block WHERE student_id=? AND teacher_id=?",
         (sid, teacher_row["id"]),
     ).fetchone()[0]
-    conn.close()
 
     assert remaining == 0
     assert block_count == 1
 
 
-def test_reject_student_individual_min_exceeding_slots(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-    slots = config_row['slots_per_day']
-
-    student = conn.execute(
-        'SELECT id, name, subjects, active, min_lessons, max_lessons FROM students ORDER BY id LIMIT 1'
-    ).fetchone()
-    conn.close()
-
-    data = _student_edit_form(config_row, student)
-    data.setlist(f'student_min_{student["id"]}', [str(slots + 3)])
-
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
-
-    assert response.status_code == 302
-    expected = 'Student minimum lessons cannot exceed slots per day for ' + student['name'] + '.'
-    assert ('error', expected) in flashes
-
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    updated = conn.execute(
-        'SELECT min_lessons, max_lessons FROM students WHERE id=?',
-        (student['id'],),
-    ).fetchone()
-    conn.close()
-
-    assert updated['min_lessons'] == student['min_lessons']
-    assert updated['max_lessons'] == student['max_lessons']
-
-
-def test_reject_student_individual_max_exceeding_slots(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+@pytest.mark.parametrize(
+    'offsets, expected_error',
+    [
+        (
+            {'student_min': 3},
+            'Student minimum lessons cannot exceed slots per day for {name}.',
+        ),
+        (
+            {'student_max': 5},
+            'Student maximum lessons cannot exceed slots per day for {name}.',
+        ),
+        (
+            {'student_min': 0, 'student_max': -1},
+            'Student min lessons greater than max for {name}',
+        ),
+    ],
+)
+def test_reject_student_individual_limits(db_conn, offsets, expected_error):
+    conn = db_conn
+    config_row = _config_row(db_conn)
     slots = config_row['slots_per_day']
 
     student = conn.execute(
         'SELECT id, name, subjects, active, min_lessons, max_lessons FROM students ORDER BY id LIMIT 1'
     ).fetchone()
-    conn.close()
 
     data = _student_edit_form(config_row, student)
-    data.setlist(f'student_max_{student["id"]}', [str(slots + 5)])
+    for field, offset in offsets.items():
+        data.setlist(f'{field}_{student["id"]}', [str(slots + offset)])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
-    expected = 'Student maximum lessons cannot exceed slots per day for ' + student['name'] + '.'
-    assert ('error', expected) in flashes
+    assert ('error', expected_error.format(name=student['name'])) in flashes
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     updated = conn.execute(
         'SELECT min_lessons, max_lessons FROM students WHERE id=?',
         (student['id'],),
     ).fetchone()
-    conn.close()
 
     assert updated['min_lessons'] == student['min_lessons']
     assert updated['max_lessons'] == student['max_lessons']
 
 
-def test_reject_student_individual_min_greater_than_max(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
-    slots = config_row['slots_per_day']
-
-    student = conn.execute(
-        'SELECT id, name, subjects, active, min_lessons, max_lessons FROM students ORDER BY id LIMIT 1'
-    ).fetchone()
-    conn.close()
-
-    data = _student_edit_form(config_row, student)
-    data.setlist(f'student_min_{student["id"]}', [str(slots)])
-    data.setlist(f'student_max_{student["id"]}', [str(max(slots - 1, 0))])
-
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
-
-    assert response.status_code == 302
-    expected = 'Student min lessons greater than max for ' + student['name']
-    assert ('error', expected) in flashes
-
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    updated = conn.execute(
-        'SELECT min_lessons, max_lessons FROM students WHERE id=?',
-        (student['id'],),
-    ).fetchone()
-    conn.close()
-
-    assert updated['min_lessons'] == student['min_lessons']
-    assert updated['max_lessons'] == student['max_lessons']
-
-
-def test_generate_schedule_uses_configured_backend(tmp_path, monkeypatch):
-    import app
-
-    conn = setup_db(tmp_path)
+def test_generate_schedule_uses_configured_backend(db_conn, monkeypatch):
+    conn = db_conn
     conn.execute('UPDATE config SET solver_backend=? WHERE id=1', ('ortools',))
     conn.commit()
-    conn.close()
 
     captured = {}
 
@@ -2279,16 +1767,15 @@ def test_generate_schedule_uses_configured_backend(tmp_path, monkeypatch):
     assert captured['backend'] == 'ortools'
 
 
-def test_teacher_without_lessons_flag_is_optional(tmp_path, monkeypatch):
-    import app
-    conn = setup_db(tmp_path)
-    config_row = _config_row(app.DB_PATH)
+def test_teacher_without_lessons_flag_is_optional(db_conn, monkeypatch):
+    conn = db_conn
+    config_row = _config_row(db_conn)
     teacher_row = conn.execute('SELECT * FROM teachers ORDER BY id LIMIT 1').fetchone()
     tid = teacher_row['id']
     slots = config_row['slots_per_day']
 
     conn.execute(
-        'INSERT INTO teachers (name, subjects, min_lessons, max_lessons, needs_lessons) VALUES (?, ?, ?, ?, ?)',
+        _INSERT_TEACHER_SQL,
         ('Backup Teacher', teacher_row['subjects'], None, None, 1),
     )
     conn.commit()
@@ -2301,18 +1788,12 @@ def test_teacher_without_lessons_flag_is_optional(tmp_path, monkeypatch):
     data.setlist('new_unavail_teacher', [str(tid)])
     data.setlist('new_unavail_slot', [str(i) for i in range(1, slots + 1)])
 
-    with app.app.test_request_context('/config', method='POST', data=data):
-        response = app.config()
-        flashes = get_flashed_messages(with_categories=True)
+    response, flashes = _post_config(data)
 
     assert response.status_code == 302
     assert not any(category == 'error' for category, _ in flashes)
 
-    conn.close()
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
     stored = conn.execute('SELECT needs_lessons, min_lessons FROM teachers WHERE id=?', (tid,)).fetchone()
-    conn.close()
     assert stored['needs_lessons'] == 0
     assert stored['min_lessons'] == 2
 
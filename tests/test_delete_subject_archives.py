@@ -1,64 +1,39 @@
-import os
-import sys
-import sqlite3
+from _fixtures import BASE_CONFIG_FORM
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-
-def setup_db(tmp_path):
-    import app
-    app.DB_PATH = str(tmp_path / 'test.db')
-    app.init_db()
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def test_deleting_subject_archives(tmp_path):
-    import app
-    conn = setup_db(tmp_path)
+def test_deleting_subject_archives(client, db_conn):
+    conn = db_conn
     c = conn.cursor()
-    c.execute('DELETE FROM subjects')
-    c.execute('DELETE FROM subjects_archive')
-    c.execute('DELETE FROM timetable')
-    conn.commit()
-    c.execute("INSERT INTO subjects (id, name, min_percentage) VALUES (1, 'Sub', 0)")
-    c.execute(
-        "INSERT INTO timetable (date, slot, student_id, teacher_id, subject_id, group_id, location_id) "
-        "VALUES ('2024-01-01', 0, NULL, NULL, 1, NULL, NULL)"
-    )
-    conn.commit()
-    conn.close()
+    conn.executescript("""
+        BEGIN;
+        DELETE FROM subjects;
+        DELETE FROM subjects_archive;
+        DELETE FROM timetable;
+        INSERT INTO subjects (id, name, min_percentage) VALUES (1, 'Sub', 0);
+        INSERT INTO timetable (date, slot, student_id, teacher_id, subject_id, group_id, location_id)
+        VALUES ('2024-01-01', 0, NULL, NULL, 1, NULL, NULL);
+        COMMIT;
+    """)
 
-    slot_starts = {f'slot_start_{i}': f'08:{30 + (i-1)*30:02d}' for i in range(1, 9)}
     data = {
-        'slots_per_day': '8',
-        'slot_duration': '30',
-        'min_lessons': '1',
-        'max_lessons': '4',
-        'teacher_min_lessons': '1',
-        'teacher_max_lessons': '8',
-        'allow_repeats': '1',
-        'max_repeats': '2',
-        'consecutive_weight': '3',
-        'attendance_weight': '10',
-        'well_attend_weight': '1',
-        'group_weight': '2',
-        'balance_weight': '1',
+        **BASE_CONFIG_FORM,
         'subject_id': '1',
         'subject_delete': '1',
         'subject_name_1': 'Sub',
         'subject_min_1': '0',
-        **slot_starts,
     }
-    with app.app.test_request_context('/config', method='POST', data=data):
-        app.config()
+    resp = client.post('/config', data=data)
+    assert resp.status_code == 302
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    assert c.execute('SELECT COUNT(*) FROM subjects WHERE id=1').fetchone()[0] == 0
-    assert c.execute('SELECT name FROM subjects_archive WHERE id=1').fetchone()[0] == 'Sub'
+    row = c.execute(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM subjects WHERE id=1) AS subjects,
+            (SELECT name FROM subjects_archive WHERE id=1) AS archived_name
+        """
+    ).fetchone()
+    assert row['subjects'] == 0
+    assert row['archived_name'] == 'Sub'
     row = c.execute(
         """
         SELECT COALESCE(sub.name, suba.name) AS subject
@@ -68,5 +43,4 @@ def test_deleting_subject_archives(tmp_path):
         """
     ).fetchone()
     assert row['subject'] == 'Sub'
-    conn.close()
 
@@ -1,49 +1,56 @@
-import os
-import sys
-import sqlite3
+import pytest
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import app
 
 
-def setup_db(tmp_path):
-    import app
-    app.DB_PATH = str(tmp_path / 'test.db')
-    app.init_db()
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def test_deleted_subject_not_recreated(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
+def test_deleted_subject_not_recreated(db_conn):
+    conn = db_conn
     c = conn.cursor()
-    # ensure clean state
-    c.execute('DELETE FROM subjects')
-    c.execute('DELETE FROM subjects_archive')
-    c.execute('DELETE FROM teachers')
-    conn.commit()
-
-    # create subject and teacher referencing it
-    c.execute("INSERT INTO subjects (id, name) VALUES (1, 'Sub')")
-    c.execute("INSERT INTO teachers (id, name, subjects) VALUES (1, 'T', '[1]')")
-    conn.commit()
-
-    # delete subject and close connection
-    c.execute('DELETE FROM subjects WHERE id=1')
-    conn.commit()
-    conn.close()
+    conn.executescript("""
+        BEGIN;
+        -- ensure clean state
+        DELETE FROM subjects;
+        DELETE FROM subjects_archive;
+        DELETE FROM teachers;
+        -- create subject and teacher referencing it
+        INSERT INTO subjects (id, name) VALUES (1, 'Sub');
+        INSERT INTO teachers (id, name, subjects) VALUES (1, 'T', '[1]');
+        -- delete subject before re-running init
+        DELETE FROM subjects WHERE id=1;
+        COMMIT;
+    """)
 
     # re-run init to trigger cleanup
     app.init_db()
 
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
     # subject should not be recreated with numeric name
     assert c.execute('SELECT COUNT(*) FROM subjects').fetchone()[0] == 0
     # teacher's subject list should be cleared
     assert c.execute('SELECT subjects FROM teachers WHERE id=1').fetchone()['subjects'] == '[]'
-    conn.close()
 
+
+def test_init_db_recreates_missing_tables(db_conn):
+    db_conn.execute('DROP TABLE student_teacher_block')
+    db_conn.commit()
+
+    app.init_db()
+    assert db_conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name='student_teacher_block'"
+    ).fetchone()[0] == 1
+
+
+def test_init_db_rolls_back_and_releases_lock_on_error(db_conn, monkeypatch):
+    def failing_schema(c):
+        c.execute('DROP TABLE student_teacher_block')
+        raise RuntimeError('migration failed')
+
+    monkeypatch.setattr(app, '_ensure_schema', failing_schema)
+    with pytest.raises(RuntimeError):
+        app.init_db()
+
+    # the dropped table is restored and the database is writable again
+    assert db_conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name='student_teacher_block'"
+    ).fetchone()[0] == 1
+    db_conn.execute('DELETE FROM teachers')
+    db_conn.commit()
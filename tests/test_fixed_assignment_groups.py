@@ -1,25 +1,13 @@
-import os
-import sys
+import json
 
-# Ensure the application package can be imported when tests are executed
-# from within the ``tests`` directory.
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import app
+from _fixtures import BASE_CONFIG_FORM
 
 
-def setup_db(tmp_path):
-    import app, sqlite3
-    app.DB_PATH = str(tmp_path / 'test.db')
-    app.init_db()
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def test_group_fixed_assignment_priority(tmp_path):
-    import app, json
-    conn = setup_db(tmp_path)
+def test_group_fixed_assignment_priority(db_conn, subject_ids):
+    conn = db_conn
     c = conn.cursor()
-    math_id = c.execute("SELECT id FROM subjects WHERE name='Math'").fetchone()[0]
+    math_id = subject_ids['Math']
     # create groups and members
     c.execute("INSERT INTO groups (name, subjects) VALUES ('Group A', ?)", (json.dumps([math_id]),))
     c.execute("INSERT INTO groups (name, subjects) VALUES ('Group B', ?)", (json.dumps([math_id]),))
@@ -28,24 +16,19 @@ def test_group_fixed_assignment_priority(tmp_path):
     conn.commit()
 
     # prepare POST data with both student and group set
-    slot_starts = {f'slot_start_{i}': f'08:{30 + (i-1)*30:02d}' for i in range(1,9)}
     data = {
-        'slots_per_day':'8', 'slot_duration':'30',
-        'min_lessons':'1', 'max_lessons':'4',
-        'teacher_min_lessons':'1', 'teacher_max_lessons':'8',
-        'allow_repeats':'1',
-        'max_repeats':'2', 'consecutive_weight':'3',
-        'attendance_weight':'10', 'well_attend_weight':'1',
-        'group_weight':'2.0', 'balance_weight':'1',
-        'new_assign_teacher':'1', 'new_assign_group':'2',
-        'new_assign_student':'1', 'new_assign_subject':str(math_id),
-        'new_assign_slot':'1', **slot_starts
+        **BASE_CONFIG_FORM,
+        'group_weight': '2.0',
+        'new_assign_teacher': '1',
+        'new_assign_group': '2',
+        'new_assign_student': '1',
+        'new_assign_subject': str(math_id),
+        'new_assign_slot': '1',
     }
     with app.app.test_request_context('/config', method='POST', data=data):
         app.config()
 
     row = conn.execute('SELECT teacher_id, student_id, group_id, subject_id, slot FROM fixed_assignments').fetchone()
-    conn.close()
     assert row['student_id'] is None
     assert row['group_id'] == 2
     assert row['teacher_id'] == 1
@@ -53,35 +36,29 @@ def test_group_fixed_assignment_priority(tmp_path):
     assert row['slot'] == 0
 
 
-def test_group_fixed_assignment_suppressed(tmp_path):
-    import app, json
-    conn = setup_db(tmp_path)
+def test_group_fixed_assignment_suppressed(db_conn, subject_ids):
+    conn = db_conn
     c = conn.cursor()
-    math_id = c.execute("SELECT id FROM subjects WHERE name='Math'").fetchone()[0]
+    math_id = subject_ids['Math']
     c.execute("INSERT INTO groups (name, subjects) VALUES ('Group A', ?)", (json.dumps([math_id]),))
     c.execute("INSERT INTO groups (name, subjects) VALUES ('Group B', ?)", (json.dumps([math_id]),))
     c.execute("INSERT INTO group_members (group_id, student_id) VALUES (1,1)")
     c.execute("INSERT INTO group_members (group_id, student_id) VALUES (2,2)")
     conn.commit()
 
-    slot_starts = {f'slot_start_{i}': f'08:{30 + (i-1)*30:02d}' for i in range(1,9)}
     data = {
-        'slots_per_day':'8', 'slot_duration':'30',
-        'min_lessons':'1', 'max_lessons':'4',
-        'teacher_min_lessons':'1', 'teacher_max_lessons':'8',
-        'allow_repeats':'1',
-        'max_repeats':'2', 'consecutive_weight':'3',
-        'attendance_weight':'10', 'well_attend_weight':'1',
-        'group_weight':'0', 'balance_weight':'1',
-        'new_assign_teacher':'1', 'new_assign_group':'2',
-        'new_assign_student':'1', 'new_assign_subject':str(math_id),
-        'new_assign_slot':'1', **slot_starts,
+        **BASE_CONFIG_FORM,
+        'group_weight': '0',
+        'new_assign_teacher': '1',
+        'new_assign_group': '2',
+        'new_assign_student': '1',
+        'new_assign_subject': str(math_id),
+        'new_assign_slot': '1',
     }
     with app.app.test_request_context('/config', method='POST', data=data):
         app.config()
 
     row = conn.execute('SELECT teacher_id, student_id, group_id, subject_id, slot FROM fixed_assignments').fetchone()
-    conn.close()
     assert row['group_id'] is None
     assert row['student_id'] == 1
     assert row['teacher_id'] == 1
@@ -89,12 +66,10 @@ def test_group_fixed_assignment_suppressed(tmp_path):
     assert row['slot'] == 0
 
 
-def test_group_deletion_blocked_by_fixed_assignment(tmp_path):
-    import app, json
-
-    conn = setup_db(tmp_path)
+def test_group_deletion_blocked_by_fixed_assignment(db_conn, subject_ids):
+    conn = db_conn
     c = conn.cursor()
-    math_id = c.execute("SELECT id FROM subjects WHERE name='Math'").fetchone()[0]
+    math_id = subject_ids['Math']
     c.execute("INSERT INTO groups (name, subjects) VALUES (?, ?)", ('Group A', json.dumps([math_id])))
     gid = c.lastrowid
     c.execute(
@@ -103,31 +78,17 @@ def test_group_deletion_blocked_by_fixed_assignment(tmp_path):
     )
     conn.commit()
 
-    slot_starts = {f'slot_start_{i}': f'08:{30 + (i-1)*30:02d}' for i in range(1, 9)}
     data = {
-        'slots_per_day': '8',
-        'slot_duration': '30',
-        'min_lessons': '1',
-        'max_lessons': '4',
-        'teacher_min_lessons': '1',
-        'teacher_max_lessons': '8',
-        'allow_repeats': '1',
-        'max_repeats': '2',
-        'consecutive_weight': '3',
-        'attendance_weight': '10',
-        'well_attend_weight': '1',
+        **BASE_CONFIG_FORM,
         'group_weight': '2.0',
-        'balance_weight': '1',
         'group_id': str(gid),
         'group_delete': str(gid),
-        **slot_starts,
     }
     with app.app.test_request_context('/config', method='POST', data=data):
         app.config()
 
     group = conn.execute('SELECT name FROM groups WHERE id=?', (gid,)).fetchone()
     fa_count = conn.execute('SELECT COUNT(*) FROM fixed_assignments WHERE group_id=?', (gid,)).fetchone()[0]
-    conn.close()
 
     assert group is not None
     assert fa_count == 1
@@ -1,10 +1,5 @@
-import os
-import sys
 import json
 
-# Ensure the application package can be imported when tests are executed
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-
 from solver.api import build_model, solve_model
 
 
@@ -1,80 +1,44 @@
 import json
-import os
-import sys
-
-# Ensure the application package can be imported when tests are executed
-# from within the ``tests`` directory.
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-
-def setup_db(tmp_path):
-    import app, sqlite3
-    app.DB_PATH = str(tmp_path / 'test.db')
-    app.init_db()
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def test_location_shown_in_timetable_grid(tmp_path):
-    import app
-    conn = setup_db(tmp_path)
-    c = conn.cursor()
-    # create a location and assign it to a timetable entry
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def room_a_lesson(db_conn, subject_ids):
+    """Put Room A on a Math lesson for student 1 and teacher 1 in slot 0."""
+    c = db_conn.cursor()
     c.execute("INSERT INTO locations (name) VALUES ('Room A')")
-    math_id = c.execute("SELECT id FROM subjects WHERE name='Math'").fetchone()[0]
     c.execute(
         "INSERT INTO timetable (student_id, teacher_id, subject_id, slot, location_id, date) VALUES (1, 1, ?, 0, 1, '2024-01-01')",
-        (math_id,),
+        (subject_ids['Math'],),
     )
-    conn.commit()
-    conn.close()
+    db_conn.commit()
+
 
+def test_location_shown_in_timetable_grid(room_a_lesson):
     (_, _, teachers, grid, _, _, _, _, _, _) = app.get_timetable_data('2024-01-01')
     # timetable entry for teacher 1 in slot 0 should include the location name
     assert 'Room A' in grid[0][teachers[0]['id']]
 
 
-def test_location_view_groups_by_location(tmp_path):
-    import app
-    conn = setup_db(tmp_path)
-    c = conn.cursor()
-    c.execute("INSERT INTO locations (name) VALUES ('Room A')")
-    math_id = c.execute("SELECT id FROM subjects WHERE name='Math'").fetchone()[0]
-    c.execute(
-        "INSERT INTO timetable (student_id, teacher_id, subject_id, slot, location_id, date) VALUES (1, 1, ?, 0, 1, '2024-01-01')",
-        (math_id,),
-    )
-    conn.commit()
-    conn.close()
-
+def test_location_view_groups_by_location(room_a_lesson):
     (_, _, locations, grid, _, _, _, _, _, _) = app.get_timetable_data('2024-01-01', view='location')
     assert locations[0]['name'] == 'Room A'
     assert grid[0][locations[0]['id']] == 'Student 1 (Math) with Teacher A'
 
 
-def test_patient_only_view(tmp_path):
-    import app
-    conn = setup_db(tmp_path)
-    c = conn.cursor()
-    c.execute("INSERT INTO locations (name) VALUES ('Room A')")
-    math_id = c.execute("SELECT id FROM subjects WHERE name='Math'").fetchone()[0]
-    c.execute(
-        "INSERT INTO timetable (student_id, teacher_id, subject_id, slot, location_id, date) VALUES (1, 1, ?, 0, 1, '2024-01-01')",
-        (math_id,),
-    )
-    conn.commit()
-    conn.close()
-
+def test_patient_only_view(room_a_lesson):
     (_, _, locations, grid, _, _, _, _, _, _) = app.get_timetable_data('2024-01-01', view='patient_only')
     assert grid[0][locations[0]['id']] == 'Student 1'
 
 
-def test_deleted_group_members_display_from_snapshot(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
+def test_deleted_group_members_display_from_snapshot(db_conn, subject_ids):
+    conn = db_conn
     c = conn.cursor()
 
-    math_id = c.execute("SELECT id FROM subjects WHERE name='Math'").fetchone()[0]
+    math_id = subject_ids['Math']
     teacher_id = c.execute("SELECT id FROM teachers WHERE name='Teacher A'").fetchone()[0]
 
     c.execute("INSERT INTO groups (name, subjects) VALUES (?, ?)", ('Legacy Group', json.dumps([math_id])))
@@ -90,13 +54,11 @@ def test_deleted_group_members_display_from_snapshot(tmp_path):
     )
 
     app.get_missing_and_counts(c, '2024-01-01', refresh=True)
-    conn.commit()
 
     c.execute('INSERT INTO groups_archive (id, name) VALUES (?, ?)', (gid, 'Legacy Group'))
     c.execute('DELETE FROM group_members WHERE group_id=?', (gid,))
     c.execute('DELETE FROM groups WHERE id=?', (gid,))
     conn.commit()
-    conn.close()
 
     (_, _, _, grid, _, _, _, _, _, group_view) = app.get_timetable_data('2024-01-01')
     entry = grid[0][teacher_id]
@@ -110,13 +72,11 @@ def test_deleted_group_members_display_from_snapshot(tmp_path):
     assert {m['name'] for m in members} >= {'Student 1', 'Student 2'}
 
 
-def test_group_membership_updates_after_refresh(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
+def test_group_membership_updates_after_refresh(db_conn, subject_ids):
+    conn = db_conn
     c = conn.cursor()
 
-    math_id = c.execute("SELECT id FROM subjects WHERE name='Math'").fetchone()[0]
+    math_id = subject_ids['Math']
     teacher_id = c.execute("SELECT id FROM teachers WHERE name='Teacher A'").fetchone()[0]
 
     c.execute("INSERT INTO groups (name, subjects) VALUES (?, ?)", ('Dynamic Group', json.dumps([math_id])))
@@ -132,7 +92,6 @@ def test_group_membership_updates_after_refresh(tmp_path):
     )
 
     app.get_missing_and_counts(c, '2024-01-01', refresh=True)
-    conn.commit()
 
     # Update the group membership after the snapshot has been created.
     c.execute('DELETE FROM group_members WHERE group_id=?', (gid,))
@@ -162,16 +121,12 @@ def test_group_membership_updates_after_refresh(tmp_path):
     assert members_after >= {1, 3}
     assert 2 not in members_after
 
-    conn.close()
 
-
-def test_deleted_location_displayed_from_snapshot(tmp_path):
-    import app
-
-    conn = setup_db(tmp_path)
+def test_deleted_location_displayed_from_snapshot(db_conn, subject_ids):
+    conn = db_conn
     c = conn.cursor()
 
-    math_id = c.execute("SELECT id FROM subjects WHERE name='Math'").fetchone()[0]
+    math_id = subject_ids['Math']
     teacher_id = c.execute("SELECT id FROM teachers WHERE name='Teacher A'").fetchone()[0]
 
     c.execute("INSERT INTO locations (name) VALUES ('Room A')")
@@ -182,12 +137,10 @@ def test_deleted_location_displayed_from_snapshot(tmp_path):
     )
 
     app.get_missing_and_counts(c, '2024-01-01', refresh=True)
-    conn.commit()
 
     c.execute("INSERT INTO locations_archive (id, name) VALUES (?, ?)", (1, 'Room A'))
     c.execute('DELETE FROM locations WHERE id=?', (1,))
     conn.commit()
-    conn.close()
 
     (_, _, _, teacher_grid, _, _, _, _, _, _) = app.get_timetable_data('2024-01-01')
     teacher_entry = teacher_grid[0][teacher_id]
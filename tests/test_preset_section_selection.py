@@ -1,49 +1,50 @@
+import copy
 import json
-import os
-import sys
-import sqlite3
 
+import pytest
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 import app
 
 
-def setup_db(tmp_path):
-    app.DB_PATH = str(tmp_path / 'test.db')
-    app.init_db()
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+@pytest.fixture(scope='module')
+def baseline_preset(db_template):
+    """Return ``app.dump_configuration()`` of the untouched seeded template.
 
+    Tests take a deep copy because ``restore_configuration`` migrates the
+    preset it is given in place.
+    """
+    original = app.DB_PATH
+    app.DB_PATH = str(db_template)
+    try:
+        return app.dump_configuration()
+    finally:
+        app.DB_PATH = original
 
-def test_restore_selected_sections_only_updates_requested_tables(tmp_path):
-    conn = setup_db(tmp_path)
+
+def test_restore_selected_sections_only_updates_requested_tables(db_conn, baseline_preset):
+    conn = db_conn
     cur = conn.cursor()
 
-    preset = app.dump_configuration()
+    preset = copy.deepcopy(baseline_preset)
 
     cur.execute('UPDATE config SET slot_duration = slot_duration + 5 WHERE id = 1')
     cur.execute("UPDATE subjects SET name = 'Biology' WHERE id = 1")
     cur.execute("UPDATE teachers SET name = 'Changed Teacher' WHERE id = 1")
     conn.commit()
-    conn.close()
 
     app.restore_configuration(preset, overwrite=True, sections=['general', 'subjects'])
 
-    conn = sqlite3.connect(app.DB_PATH)
-    cur = conn.cursor()
     slot_duration = cur.execute('SELECT slot_duration FROM config WHERE id = 1').fetchone()[0]
     subject_name = cur.execute('SELECT name FROM subjects WHERE id = 1').fetchone()[0]
     teacher_name = cur.execute('SELECT name FROM teachers WHERE id = 1').fetchone()[0]
-    conn.close()
 
     assert slot_duration == preset['data']['config'][0]['slot_duration']
     assert subject_name == preset['data']['subjects'][0]['name']
     assert teacher_name == 'Changed Teacher'
 
 
-def test_student_section_forces_related_dependencies(tmp_path):
-    conn = setup_db(tmp_path)
+def test_student_section_forces_related_dependencies(db_conn):
+    conn = db_conn
     cur = conn.cursor()
 
     cur.execute('SELECT id FROM locations LIMIT 1')
@@ -70,18 +71,14 @@ def test_student_section_forces_related_dependencies(tmp_path):
     cur.execute("UPDATE locations SET name = 'Updated Location' WHERE id = ?", (location_id,))
     cur.execute("UPDATE students SET name = 'Changed Student' WHERE id = ?", (student_id,))
     conn.commit()
-    conn.close()
 
     app.restore_configuration(preset, overwrite=True, sections=['students'])
 
-    conn = sqlite3.connect(app.DB_PATH)
-    cur = conn.cursor()
     slot_duration = cur.execute('SELECT slot_duration FROM config WHERE id = ?', (config_id,)).fetchone()[0]
     subject_name = cur.execute('SELECT name FROM subjects WHERE id = ?', (subject_id,)).fetchone()[0]
     teacher_name = cur.execute('SELECT name FROM teachers WHERE id = ?', (teacher_id,)).fetchone()[0]
     location_name = cur.execute('SELECT name FROM locations WHERE id = ?', (location_id,)).fetchone()[0]
     student_name = cur.execute('SELECT name FROM students WHERE id = ?', (student_id,)).fetchone()[0]
-    conn.close()
 
     assert slot_duration == preset['data']['config'][0]['slot_duration']
     assert subject_name == preset['data']['subjects'][0]['name']
@@ -90,11 +87,11 @@ def test_student_section_forces_related_dependencies(tmp_path):
     assert student_name == preset['data']['students'][0]['name']
 
 
-def test_partial_teacher_restore_cleans_dependent_tables(tmp_path):
-    conn = setup_db(tmp_path)
+def test_partial_teacher_restore_cleans_dependent_tables(db_conn, baseline_preset):
+    conn = db_conn
     cur = conn.cursor()
 
-    preset = app.dump_configuration()
+    preset = copy.deepcopy(baseline_preset)
 
     student_id = preset['data']['students'][0]['id']
     subject_row = preset['data']['subjects'][0]
@@ -117,24 +114,27 @@ def test_partial_teacher_restore_cleans_dependent_tables(tmp_path):
         (teacher_id, student_id, subject_id, 1),
     )
     conn.commit()
-    conn.close()
 
     app.restore_configuration(preset, overwrite=True, sections=['teachers'])
 
-    conn = sqlite3.connect(app.DB_PATH)
+    counts = cur.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM teachers WHERE id=:id) AS teachers,
+            (SELECT COUNT(*) FROM student_teacher_block WHERE teacher_id=:id) AS blocks,
+            (SELECT COUNT(*) FROM teacher_unavailable WHERE teacher_id=:id) AS unavailable,
+            (SELECT COUNT(*) FROM fixed_assignments WHERE teacher_id=:id) AS fixed
+    """, {'id': teacher_id}).fetchone()
+    assert counts['teachers'] == 0
+    assert counts['blocks'] == 0
+    assert counts['unavailable'] == 0
+    assert counts['fixed'] == 0
+
+
+def test_partial_student_restore_cleans_dependent_tables(db_conn, baseline_preset):
+    conn = db_conn
     cur = conn.cursor()
-    assert cur.execute('SELECT COUNT(*) FROM teachers WHERE id=?', (teacher_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM student_teacher_block WHERE teacher_id=?', (teacher_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM teacher_unavailable WHERE teacher_id=?', (teacher_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM fixed_assignments WHERE teacher_id=?', (teacher_id,)).fetchone()[0] == 0
-    conn.close()
 
-
-def test_partial_student_restore_cleans_dependent_tables(tmp_path):
-    conn = setup_db(tmp_path)
-    cur = conn.cursor()
-
-    preset = app.dump_configuration()
+    preset = copy.deepcopy(baseline_preset)
 
     subject_row = preset['data']['subjects'][0]
     subject_id = subject_row['id']
@@ -178,26 +178,31 @@ def test_partial_student_restore_cleans_dependent_tables(tmp_path):
         (teacher_id, student_id, subject_id, 2),
     )
     conn.commit()
-    conn.close()
 
     app.restore_configuration(preset, overwrite=True, sections=['students'])
 
-    conn = sqlite3.connect(app.DB_PATH)
+    counts = cur.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM students WHERE id=:id) AS students,
+            (SELECT COUNT(*) FROM student_teacher_block WHERE student_id=:id) AS blocks,
+            (SELECT COUNT(*) FROM student_unavailable WHERE student_id=:id) AS unavailable,
+            (SELECT COUNT(*) FROM student_locations WHERE student_id=:id) AS locations,
+            (SELECT COUNT(*) FROM group_members WHERE student_id=:id) AS memberships,
+            (SELECT COUNT(*) FROM fixed_assignments WHERE student_id=:id) AS fixed
+    """, {'id': student_id}).fetchone()
+    assert counts['students'] == 0
+    assert counts['blocks'] == 0
+    assert counts['unavailable'] == 0
+    assert counts['locations'] == 0
+    assert counts['memberships'] == 0
+    assert counts['fixed'] == 0
+
+
+def test_subject_restore_prunes_json_references(db_conn, baseline_preset):
+    conn = db_conn
     cur = conn.cursor()
-    assert cur.execute('SELECT COUNT(*) FROM students WHERE id=?', (student_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM student_teacher_block WHERE student_id=?', (student_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM student_unavailable WHERE student_id=?', (student_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM student_locations WHERE student_id=?', (student_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM group_members WHERE student_id=?', (student_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM fixed_assignments WHERE student_id=?', (student_id,)).fetchone()[0] == 0
-    conn.close()
 
-
-def test_subject_restore_prunes_json_references(tmp_path):
-    conn = setup_db(tmp_path)
-    cur = conn.cursor()
-
-    preset = app.dump_configuration()
+    preset = copy.deepcopy(baseline_preset)
 
     student_id = preset['data']['students'][0]['id']
     teacher_id = preset['data']['teachers'][0]['id']
@@ -226,13 +231,9 @@ def test_subject_restore_prunes_json_references(tmp_path):
     )
 
     conn.commit()
-    conn.close()
 
     app.restore_configuration(preset, overwrite=True, sections=['subjects'])
 
-    conn = sqlite3.connect(app.DB_PATH)
-    cur = conn.cursor()
-
     cur.execute('SELECT subjects, repeat_subjects FROM students WHERE id=?', (student_id,))
     s_subjects, s_repeats = cur.fetchone()
     assert 9999 not in json.loads(s_subjects)
@@ -244,14 +245,12 @@ def test_subject_restore_prunes_json_references(tmp_path):
     cur.execute('SELECT subjects FROM groups WHERE name=?', ('Temp Group',))
     assert json.loads(cur.fetchone()[0]) == []
 
-    conn.close()
-
 
-def test_partial_location_restore_cleans_dependent_tables(tmp_path):
-    conn = setup_db(tmp_path)
+def test_partial_location_restore_cleans_dependent_tables(db_conn, baseline_preset):
+    conn = db_conn
     cur = conn.cursor()
 
-    preset = app.dump_configuration()
+    preset = copy.deepcopy(baseline_preset)
 
     student_id = preset['data']['students'][0]['id']
     group_rows = preset['data'].get('groups', [])
@@ -274,16 +273,18 @@ def test_partial_location_restore_cleans_dependent_tables(tmp_path):
         (group_id, location_id),
     )
     conn.commit()
-    conn.close()
 
     app.restore_configuration(preset, overwrite=True, sections=['locations'])
 
-    conn = sqlite3.connect(app.DB_PATH)
-    cur = conn.cursor()
-    assert cur.execute('SELECT COUNT(*) FROM locations WHERE id=?', (location_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM student_locations WHERE location_id=?', (location_id,)).fetchone()[0] == 0
-    assert cur.execute('SELECT COUNT(*) FROM group_locations WHERE location_id=?', (location_id,)).fetchone()[0] == 0
+    counts = cur.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM locations WHERE id=:id) AS locations,
+            (SELECT COUNT(*) FROM student_locations WHERE location_id=:id) AS student_locations,
+            (SELECT COUNT(*) FROM group_locations WHERE location_id=:id) AS group_locations
+    """, {'id': location_id}).fetchone()
+    assert counts['locations'] == 0
+    assert counts['student_locations'] == 0
+    assert counts['group_locations'] == 0
     has_location_column = any(row[1] == 'location_id' for row in cur.execute('PRAGMA table_info(fixed_assignments)'))
     if has_location_column:
         assert cur.execute('SELECT COUNT(*) FROM fixed_assignments WHERE location_id=?', (location_id,)).fetchone()[0] == 0
-    conn.close()
@@ -1,22 +1,8 @@
-import os
-import sys
-import sqlite3
+import app
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-
-def setup_db(tmp_path):
-    import app
-    app.DB_PATH = str(tmp_path / 'test.db')
-    app.init_db()
-    conn = sqlite3.connect(app.DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def test_restore_only_updates_config(tmp_path):
-    import app
-    conn = setup_db(tmp_path)
+def test_restore_only_updates_config(db_conn):
+    conn = db_conn
     cur = conn.cursor()
 
     # Insert timetable entry to ensure it survives preset restore
@@ -36,16 +22,12 @@ def test_restore_only_updates_config(tmp_path):
     # Modify configuration
     cur.execute('UPDATE config SET slot_duration = 45 WHERE id = 1')
     conn.commit()
-    conn.close()
 
     # Restore configuration from preset
     app.restore_configuration(preset, overwrite=True)
 
-    conn = sqlite3.connect(app.DB_PATH)
-    cur = conn.cursor()
     slot_duration = cur.execute('SELECT slot_duration FROM config').fetchone()[0]
     timetable_count = cur.execute('SELECT COUNT(*) FROM timetable').fetchone()[0]
-    conn.close()
 
     # Slot duration reverted, timetable unaffected
     assert slot_duration == preset['data']['config'][0]['slot_duration']